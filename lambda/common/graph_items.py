@@ -0,0 +1,184 @@
+"""
+Graph table item shapes for ContribConnect
+Shared by the ingest Lambda and scripts/comprehensive_scraper.py so both
+write identical nodes and edges to the nodes/edges tables
+"""
+
+import zlib
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+# Number of shards for the ShardedReverseEdgeIndex (the graph tool queries all of them)
+EDGE_BUCKETS = 16
+
+# Body text kept on pull request and issue nodes
+PR_BODY_MAX_CHARS = 1000
+ISSUE_BODY_MAX_CHARS = 500
+
+# Times a label bit claim re-reads and retries after losing a race to another writer
+LABEL_CLAIM_ATTEMPTS = 5
+
+
+def edge_bucket(from_id: str) -> int:
+    """Stable shard for an edge so re-ingesting it always lands in the same bucket"""
+    return zlib.crc32(from_id.encode('utf-8')) % EDGE_BUCKETS
+
+
+def node_item(node_id: str, node_type: str, data: Dict, updated_at: Optional[str] = None) -> Dict:
+    """Nodes table item"""
+    return {
+        'nodeId': node_id,
+        'nodeType': node_type,
+        'data': data,
+        'updatedAt': updated_at or datetime.now(timezone.utc).isoformat()
+    }
+
+
+def edge_item(from_id: str, to_id: str, edge_type: str, properties: Optional[Dict] = None,
+              attributes: Optional[Dict] = None, updated_at: Optional[str] = None) -> Dict:
+    """Edges table item, keyed for both the plain and the sharded reverse index"""
+    item = {
+        'fromId': from_id,
+        'toIdEdgeType': f"{to_id}#{edge_type}",
+        'toId': to_id,
+        'toIdBucket': f"{to_id}#{edge_bucket(from_id)}",
+        'fromIdEdgeType': f"{from_id}#{edge_type}",
+        'edgeType': edge_type,
+        'properties': properties or {},
+        'updatedAt': updated_at or datetime.now(timezone.utc).isoformat()
+    }
+    if attributes:
+        item.update(attributes)
+    return item
+
+
+def user_edge_attributes(user_data: Dict) -> Dict:
+    """
+    Display fields denormalized onto every edge leaving a user node so the
+    graph tool can render users straight from an edge query without a GetItem
+    """
+    return {
+        'fromType': 'user',
+        'userLogin': user_data.get('login'),
+        'userUrl': user_data.get('html_url'),
+        'userAvatarUrl': user_data.get('avatar_url')
+    }
+
+
+def user_node_data(user_data: Dict, contributions: Optional[int] = None) -> Dict:
+    """User node data from a REST user; contributors also carry their contribution count"""
+    data = {
+        'login': user_data.get('login'),
+        'url': user_data.get('html_url'),
+        'avatarUrl': user_data.get('avatar_url')
+    }
+    if contributions is not None:
+        data['contributions'] = contributions
+    data['type'] = 'contributor'
+    return data
+
+
+def pr_node_data(pr: Dict) -> Dict:
+    """Pull request node data from a REST-shaped pull request"""
+    return {
+        'number': pr.get('number'),
+        'title': pr.get('title'),
+        'body': (pr.get('body') or '')[:PR_BODY_MAX_CHARS],
+        'state': pr.get('state'),
+        'merged': pr.get('merged', False),
+        'draft': pr.get('draft', False),
+        'created_at': pr.get('created_at'),
+        'updated_at': pr.get('updated_at'),
+        'closed_at': pr.get('closed_at'),
+        'merged_at': pr.get('merged_at'),
+        'url': pr.get('html_url'),
+        'additions': pr.get('additions', 0),
+        'deletions': pr.get('deletions', 0),
+        'changed_files': pr.get('changed_files', 0),
+        'commits': pr.get('commits', 0),
+        'base_branch': (pr.get('base') or {}).get('ref'),
+        'head_branch': (pr.get('head') or {}).get('ref')
+    }
+
+
+def issue_node_data(issue: Dict, label_names: List[str], mask: Optional[str] = None) -> Dict:
+    """Issue node data from a REST issue; labelMask is omitted when no mask is given"""
+    data = {
+        'number': issue.get('number'),
+        'title': issue.get('title'),
+        'body': (issue.get('body') or '')[:ISSUE_BODY_MAX_CHARS],
+        'state': issue.get('state'),
+        'labels': label_names
+    }
+    if mask is not None:
+        data['labelMask'] = mask
+    data.update({
+        'createdAt': issue.get('created_at'),
+        'url': issue.get('html_url'),
+        'comments': issue.get('comments', 0)
+    })
+    return data
+
+
+def label_node_data(name: str, color: Optional[str]) -> Dict:
+    """Label node data"""
+    return {'name': name, 'color': color}
+
+
+def file_node_data(path: str) -> Dict:
+    """File node data; the directory is everything before the last slash"""
+    return {'path': path, 'directory': path.rpartition('/')[0]}
+
+
+def claim_label_bits(repos_table, org: str, repo: str, label_names: List[str]) -> Optional[Dict[str, int]]:
+    """
+    The repo's label -> bit position map, with a bit for every name in
+    label_names. New bits are saved before they are returned, conditioned on
+    the labelIndexVersion that was read, so concurrent writers (parallel
+    ingests, the scraper) can't hand the same bit to different labels; a lost
+    race re-reads the index and tries again. Returns None if the repo isn't
+    in the repos table or the claim kept losing.
+    """
+    key = {'org': org, 'repo': repo}
+    for _ in range(LABEL_CLAIM_ATTEMPTS):
+        item = repos_table.get_item(Key=key, ProjectionExpression='labelIndex, labelIndexVersion',
+                                    ConsistentRead=True).get('Item')
+        if item is None:
+            return None
+        
+        label_index = {name: int(bit) for name, bit in item.get('labelIndex', {}).items()}
+        new_labels = [name for name in dict.fromkeys(label_names) if name not in label_index]
+        if not new_labels:
+            return label_index
+        for name in new_labels:
+            label_index[name] = len(label_index)
+        
+        version = int(item.get('labelIndexVersion', 0))
+        values = {':index': label_index, ':next': version + 1}
+        if 'labelIndexVersion' in item:
+            condition = 'labelIndexVersion = :version'
+            values[':version'] = version
+        else:
+            condition = 'attribute_exists(org) AND attribute_not_exists(labelIndexVersion)'
+        try:
+            repos_table.update_item(
+                Key=key,
+                UpdateExpression='SET labelIndex = :index, labelIndexVersion = :next',
+                ConditionExpression=condition,
+                ExpressionAttributeValues=values
+            )
+            return label_index
+        except repos_table.meta.client.exceptions.ConditionalCheckFailedException:
+            continue
+    return None
+
+
+def label_mask(label_names: List[str], label_index: Dict[str, int]) -> str:
+    """
+    Encode labels as a hex bitmask over bits from claim_label_bits.
+    Stored as a string because DynamoDB numbers are limited to 38 digits.
+    """
+    mask = 0
+    for name in label_names:
+        mask |= 1 << label_index[name]
+    return format(mask, 'x')
@@ -5,11 +5,17 @@ Provides consistent JSON logging format for CloudWatch Logs Insights
 
 import json
 import logging
+import os
 import time
 from datetime import datetime
 from typing import Any, Dict, Optional
 from functools import wraps
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # Configure root logger
 logging.basicConfig(
     level=logging.INFO,
@@ -18,13 +24,26 @@ logging.basicConfig(
 
 logger = logging.getLogger()
 
+# Minimum level emitted by StructuredLogger (DEBUG, INFO, WARNING, ERROR)
+LOG_LEVEL = logging.getLevelName(os.environ.get('LOG_LEVEL', 'INFO').upper())
+if not isinstance(LOG_LEVEL, int):
+    LOG_LEVEL = logging.INFO
+
+
+def _dumps(log_entry: Dict[str, Any]) -> str:
+    """Serialize a log entry, preferring orjson when it is installed"""
+    if orjson is not None:
+        return orjson.dumps(log_entry, default=str).decode()
+    return json.dumps(log_entry, default=str)
+
 
 class StructuredLogger:
     """Structured logger for CloudWatch with JSON output"""
     
-    def __init__(self, component: str, request_id: str = ""):
+    def __init__(self, component: str, request_id: str = "", level: int = LOG_LEVEL):
         self.component = component
         self.request_id = request_id
+        self.level = level
     
     def _log(self, level: str, message: str, **kwargs):
         """Internal method to create structured log entry"""
@@ -40,10 +59,12 @@ class StructuredLogger:
         log_entry.update(kwargs)
         
         # Print as JSON for CloudWatch
-        print(json.dumps(log_entry))
+        print(_dumps(log_entry))
     
     def info(self, message: str, **kwargs):
         """Log info level message"""
+        if self.level > logging.INFO:
+            return
         self._log("INFO", message, **kwargs)
     
     def error(self, message: str, **kwargs):
@@ -52,21 +73,27 @@ class StructuredLogger:
     
     def warning(self, message: str, **kwargs):
         """Log warning level message"""
+        if self.level > logging.WARNING:
+            return
         self._log("WARNING", message, **kwargs)
     
     def debug(self, message: str, **kwargs):
         """Log debug level message"""
+        if self.level > logging.DEBUG:
+            return
         self._log("DEBUG", message, **kwargs)
     
     def tool_invocation(self, tool_name: str, action: str, duration_ms: float, 
                        status: str, **kwargs):
         """Log tool invocation with standard fields"""
+        if self.level > logging.INFO:
+            return
         self._log(
             "INFO",
             f"Tool invocation: {tool_name}.{action}",
             tool_name=tool_name,
             action=action,
-            duration_ms=round(duration_ms, 2),
+            duration_ms=round(duration_ms),
             status=status,
             **kwargs
         )
@@ -118,7 +145,7 @@ def log_execution(component: str):
             start_time = time.time()
             
             log.info(
-                f"Lambda invocation started",
+                "Lambda invocation started",
                 action="lambda_start",
                 function_name=context.function_name if hasattr(context, 'function_name') else "",
                 memory_limit_mb=context.memory_limit_in_mb if hasattr(context, 'memory_limit_in_mb') else 0
@@ -129,7 +156,7 @@ def log_execution(component: str):
                 duration_ms = (time.time() - start_time) * 1000
                 
                 log.info(
-                    f"Lambda invocation completed",
+                    "Lambda invocation completed",
                     action="lambda_complete",
                     duration_ms=round(duration_ms, 2),
                     status="success"
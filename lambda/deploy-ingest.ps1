@@ -41,10 +41,11 @@ New-Item -ItemType Directory -Path $TempDir -Force | Out-Null
 
 # Install dependencies
 Write-Host "Installing dependencies..."
-pip install -r lambda/ingest/requirements.txt -t $TempDir --quiet
+pip install -r lambda/ingest/requirements.txt -t $TempDir --platform manylinux2014_x86_64 --python-version 3.13 --implementation cp --only-binary=:all: --quiet
 
 # Copy Lambda function
 Copy-Item lambda/ingest/lambda_function.py $TempDir/
+Copy-Item lambda/common/graph_items.py $TempDir/
 
 # Create ZIP
 $ZipFile = "lambda/ingest/function.zip"
@@ -8,8 +8,10 @@ import os
 import sys
 import boto3
 import time
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List, Any, Optional
 from boto3.dynamodb.conditions import Key, Attr
+from boto3.dynamodb.types import TypeDeserializer
 
 # Add common directory to path for logger import
 sys.path.insert(0, '/opt/python')  # Lambda layer path
@@ -20,10 +22,13 @@ try:
 except ImportError:
     # Fallback if logger not available
     class StructuredLogger:
-        def __init__(self, *args, **kwargs): pass
-        def info(self, msg, **kwargs): print(f"INFO: {msg}")
+        def __init__(self, *args, **kwargs):
+            self.quiet = os.environ.get('LOG_LEVEL', 'INFO').upper() in ('WARNING', 'ERROR')
+        def info(self, msg, **kwargs):
+            if not self.quiet: print(f"INFO: {msg}")
         def error(self, msg, **kwargs): print(f"ERROR: {msg}")
-        def tool_invocation(self, **kwargs): print(f"TOOL: {kwargs}")
+        def tool_invocation(self, **kwargs):
+            if not self.quiet: print(f"TOOL: {kwargs}")
     
     def log_execution(component):
         def decorator(func):
@@ -33,6 +38,11 @@ except ImportError:
 # Initialize AWS clients
 dynamodb = boto3.resource('dynamodb')
 
+# Low-level client for queries fanned out across threads; unlike resources,
+# boto3 clients are thread-safe
+ddb_client = boto3.client('dynamodb')
+deserializer = TypeDeserializer()
+
 # Environment variables
 NODES_TABLE = os.environ.get('NODES_TABLE', 'cc-nodes-dev')
 EDGES_TABLE = os.environ.get('EDGES_TABLE', 'cc-edges-dev')
@@ -41,6 +51,16 @@ EDGES_TABLE = os.environ.get('EDGES_TABLE', 'cc-edges-dev')
 nodes_table = dynamodb.Table(NODES_TABLE)
 edges_table = dynamodb.Table(EDGES_TABLE)
 
+# Number of shards for the ShardedReverseEdgeIndex (must match ingestion)
+EDGE_BUCKETS = 16
+
+# One pool for sharded fan-out queries (every bucket plus the unsharded
+# index), reused across calls and warm invocations
+edge_query_executor = ThreadPoolExecutor(max_workers=EDGE_BUCKETS)
+
+# Issues sampled per label when looking for label experts
+MAX_EDGES_PER_LABEL = 20
+
 
 def get_node(node_id: str) -> Optional[Dict]:
     """Get a node by ID"""
@@ -52,6 +72,25 @@ def get_node(node_id: str) -> Optional[Dict]:
         return None
 
 
+def get_edge_user(edge: Dict) -> Optional[Dict]:
+    """
+    Get display fields for the user an edge originates from.
+    Uses the fields denormalized onto the edge at ingestion time and only
+    falls back to a node lookup for edges written before they existed.
+    """
+    if edge.get('fromType') == 'user':
+        return {
+            'login': edge.get('userLogin'),
+            'url': edge.get('userUrl'),
+            'avatarUrl': edge.get('userAvatarUrl')
+        }
+    
+    user_node = get_node(edge['fromId'])
+    if user_node and user_node.get('nodeType') == 'user':
+        return user_node.get('data', {})
+    return None
+
+
 def get_outgoing_edges(from_id: str, edge_type: Optional[str] = None) -> List[Dict]:
     """Get all outgoing edges from a node"""
     try:
@@ -69,14 +108,43 @@ def get_outgoing_edges(from_id: str, edge_type: Optional[str] = None) -> List[Di
         return []
 
 
-def get_incoming_edges(to_id: str, edge_type: Optional[str] = None) -> List[Dict]:
-    """Get all incoming edges to a node using GSI"""
+def query_edge_index(index_name: str, key_name: str, key_value: str) -> List[Dict]:
+    """Get every edge under one key of an edges table GSI, following pagination, via the thread-safe client"""
+    query_kwargs = {
+        'TableName': EDGES_TABLE,
+        'IndexName': index_name,
+        'KeyConditionExpression': f"{key_name} = :key",
+        'ExpressionAttributeValues': {':key': {'S': key_value}}
+    }
+    edges = []
+    while True:
+        response = ddb_client.query(**query_kwargs)
+        edges.extend({k: deserializer.deserialize(v) for k, v in item.items()} for item in response.get('Items', []))
+        if 'LastEvaluatedKey' not in response:
+            return edges
+        query_kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+
+def query_edge_bucket(to_id: str, bucket: int) -> List[Dict]:
+    """Get the incoming edges stored in a single shard of the sharded GSI"""
+    return query_edge_index('ShardedReverseEdgeIndex', 'toIdBucket', f"{to_id}#{bucket}")
+
+
+def get_incoming_edges(to_id: str, edge_type: Optional[str] = None, sharded: bool = False) -> List[Dict]:
+    """
+    Get all incoming edges to a node using GSI
+    
+    With sharded=True the query fans out over every bucket of the sharded
+    index concurrently; use it for hot targets such as popular labels or
+    repos with many contributors. Every edge carries toIdBucket (older ones
+    via scripts/backfill_edge_buckets.py), so the shards hold them all.
+    """
     try:
-        response = edges_table.query(
-            IndexName='ReverseEdgeIndex',
-            KeyConditionExpression=Key('toId').eq(to_id)
-        )
-        edges = response.get('Items', [])
+        if sharded:
+            futures = [edge_query_executor.submit(query_edge_bucket, to_id, b) for b in range(EDGE_BUCKETS)]
+            edges = [edge for future in futures for edge in future.result()]
+        else:
+            edges = query_edge_index('ReverseEdgeIndex', 'toId', to_id)
         
         # Filter by edge type if specified
         if edge_type:
@@ -228,35 +296,43 @@ def find_reviewers(issue_labels: List[str], repo: str) -> Dict[str, Any]:
                 'reason': f"Top contributor with {contributor['contributions']} contributions"
             })
     
+    # AUTHORED edges per issue; an issue carrying several of the labels is
+    # only looked up once
+    issue_authors = {}
+    
     # If specific labels provided, try to find label-specific experts
     if issue_labels and issue_labels != ['good first issue']:
-        for label in issue_labels:
+        for label in dict.fromkeys(issue_labels):
             label_id = f"label#{repo}#{label}"
             
             # Find issues with this label
-            label_edges = get_incoming_edges(label_id, 'HAS_LABEL')
+            label_edges = get_incoming_edges(label_id, 'HAS_LABEL', sharded=True)
             
             # Find users who worked on similar issues
             user_counts = {}
-            for edge in label_edges[:20]:
+            user_edges = {}
+            for edge in label_edges[:MAX_EDGES_PER_LABEL]:
                 issue_id = edge['fromId']
                 
                 # Find who authored this issue
-                issue_edges = get_incoming_edges(issue_id, 'AUTHORED')
+                if issue_id not in issue_authors:
+                    issue_authors[issue_id] = get_incoming_edges(issue_id, 'AUTHORED')
+                issue_edges = issue_authors[issue_id]
                 for issue_edge in issue_edges:
                     user_id = issue_edge['fromId']
                     user_counts[user_id] = user_counts.get(user_id, 0) + 1
+                    user_edges[user_id] = issue_edge
             
             # Get top contributors for this label
             top_users = sorted(user_counts.items(), key=lambda x: x[1], reverse=True)[:3]
             
             label_experts[label] = []
             for user_id, count in top_users:
-                user_node = get_node(user_id)
-                if user_node and user_node.get('nodeType') == 'user':
+                user = get_edge_user(user_edges[user_id])
+                if user:
                     expert = {
-                        'login': user_node['data'].get('login'),
-                        'url': user_node['data'].get('url'),
+                        'login': user.get('login'),
+                        'url': user.get('url'),
                         'issueCount': count,
                         'expertise': label
                     }
@@ -293,6 +369,10 @@ def find_related_issues(issue_id: str, repo: str) -> Dict[str, Any]:
     
     issue_data = issue_node.get('data', {})
     issue_labels = issue_data.get('labels', [])
+    label_set = set(issue_labels)
+    
+    # Label bitmask written at ingestion time (hex string, one bit per repo label)
+    original_mask = int(issue_data['labelMask'], 16) if issue_data.get('labelMask') else None
     
     related_issues = []
     
@@ -301,7 +381,7 @@ def find_related_issues(issue_id: str, repo: str) -> Dict[str, Any]:
         label_id = f"label#{repo}#{label}"
         
         # Get issues with this label
-        label_edges = get_incoming_edges(label_id, 'HAS_LABEL')
+        label_edges = get_incoming_edges(label_id, 'HAS_LABEL', sharded=True)
         
         for edge in label_edges[:10]:
             related_issue_id = edge['fromId']
@@ -314,9 +394,15 @@ def find_related_issues(issue_id: str, repo: str) -> Dict[str, Any]:
             if related_issue_node:
                 related_data = related_issue_node.get('data', {})
                 
-                # Calculate similarity score
-                shared_labels = set(issue_labels) & set(related_data.get('labels', []))
-                similarity_score = len(shared_labels) / max(len(issue_labels), 1)
+                # Calculate similarity score; shared_labels is the sharedLabels response
+                # field, and counts the overlap when either issue has no labelMask
+                shared_labels = [l for l in related_data.get('labels', []) if l in label_set]
+                related_mask = related_data.get('labelMask')
+                if original_mask is not None and related_mask:
+                    shared_count = (original_mask & int(related_mask, 16)).bit_count()
+                else:
+                    shared_count = len(set(shared_labels))
+                similarity_score = shared_count / max(len(issue_labels), 1)
                 
                 related_issues.append({
                     'issueId': related_issue_id,
@@ -325,7 +411,7 @@ def find_related_issues(issue_id: str, repo: str) -> Dict[str, Any]:
                     'state': related_data.get('state'),
                     'url': related_data.get('url'),
                     'labels': related_data.get('labels', []),
-                    'sharedLabels': list(shared_labels),
+                    'sharedLabels': shared_labels,
                     'similarityScore': similarity_score
                 })
     
@@ -360,7 +446,7 @@ def get_top_contributors(repo: str, limit: int = 10) -> Dict[str, Any]:
     repo_id = f"repo#{repo}"
     
     # Get all CONTRIBUTES_TO edges pointing to this repo
-    edges = get_incoming_edges(repo_id, 'CONTRIBUTES_TO')
+    edges = get_incoming_edges(repo_id, 'CONTRIBUTES_TO', sharded=True)
     
     contributors = []
     
@@ -383,10 +469,9 @@ def get_top_contributors(repo: str, limit: int = 10) -> Dict[str, Any]:
     
     for edge in edges:
         user_id = edge['fromId']
-        user_node = get_node(user_id)
+        user_data = get_edge_user(edge)
         
-        if user_node:
-            user_data = user_node.get('data', {})
+        if user_data:
             contributions = edge.get('properties', {}).get('contributions', 0)
             
             # Convert Decimal to int for JSON serialization
@@ -428,14 +513,17 @@ def lambda_handler(event, context):
         action = body.get('action')
         params = body.get('params', {})
         
-        log.info(f"Processing graph query", action=action, params=params)
+        # Shared log context, built once and merged into each log site
+        base_ctx = {'action': action}
+        
+        log.info(f"Processing graph query", **base_ctx, params=params)
         
         if action == 'get_top_contributors':
             repo = params.get('repo', '')
             limit = params.get('limit', 10)
             
             if not repo:
-                log.error("Missing required parameters", action=action, missing="repo")
+                log.error("Missing required parameters", **base_ctx, missing="repo")
                 return {
                     'statusCode': 400,
                     'body': json.dumps({'error': 'repo parameter required'})
@@ -443,11 +531,11 @@ def lambda_handler(event, context):
             
             query_start = time.time()
             result = get_top_contributors(repo, limit)
-            query_duration = (time.time() - query_start) * 1000
+            query_duration = int((time.time() - query_start) * 1000)
             
             log.tool_invocation(
                 tool_name="graph",
-                action="get_top_contributors",
+                **base_ctx,
                 duration_ms=query_duration,
                 status="success",
                 repo=repo,
@@ -459,7 +547,7 @@ def lambda_handler(event, context):
             repo = params.get('repo', '')
             
             if not labels or not repo:
-                log.error("Missing required parameters", action=action, missing="labels or repo")
+                log.error("Missing required parameters", **base_ctx, missing="labels or repo")
                 return {
                     'statusCode': 400,
                     'body': json.dumps({'error': 'labels and repo parameters required'})
@@ -467,11 +555,11 @@ def lambda_handler(event, context):
             
             query_start = time.time()
             result = find_reviewers(labels, repo)
-            query_duration = (time.time() - query_start) * 1000
+            query_duration = int((time.time() - query_start) * 1000)
             
             log.tool_invocation(
                 tool_name="graph",
-                action="find_reviewers",
+                **base_ctx,
                 duration_ms=query_duration,
                 status="success",
                 repo=repo,
@@ -484,7 +572,7 @@ def lambda_handler(event, context):
             topic = params.get('topic', '')
             
             if not repo:
-                log.error("Missing required parameters", action=action, missing="repo")
+                log.error("Missing required parameters", **base_ctx, missing="repo")
                 return {
                     'statusCode': 400,
                     'body': json.dumps({'error': 'repo parameter required'})
@@ -509,7 +597,7 @@ def lambda_handler(event, context):
                         'contributions': contributor['contributions']
                     })
             
-            query_duration = (time.time() - query_start) * 1000
+            query_duration = int((time.time() - query_start) * 1000)
             
             result = {
                 'repository': repo,
@@ -523,7 +611,7 @@ def lambda_handler(event, context):
             
             log.tool_invocation(
                 tool_name="graph",
-                action="find_relevant_issues",
+                **base_ctx,
                 duration_ms=query_duration,
                 status="success",
                 repo=repo,
@@ -536,7 +624,7 @@ def lambda_handler(event, context):
             repo = params.get('repo', '')
             
             if not issue_id or not repo:
-                log.error("Missing required parameters", action=action, missing="issueId or repo")
+                log.error("Missing required parameters", **base_ctx, missing="issueId or repo")
                 return {
                     'statusCode': 400,
                     'body': json.dumps({'error': 'issueId and repo parameters required'})
@@ -544,7 +632,7 @@ def lambda_handler(event, context):
             
             query_start = time.time()
             result = find_related_issues(issue_id, repo)
-            query_duration = (time.time() - query_start) * 1000
+            query_duration = int((time.time() - query_start) * 1000)
             
             # Handle both success and error cases
             status = "success" if not result.get('error') else "not_found"
@@ -552,7 +640,7 @@ def lambda_handler(event, context):
             
             log.tool_invocation(
                 tool_name="graph",
-                action="find_related_issues",
+                **base_ctx,
                 duration_ms=query_duration,
                 status=status,
                 repo=repo,
@@ -561,7 +649,7 @@ def lambda_handler(event, context):
             )
             
         else:
-            log.error("Invalid action", action=action)
+            log.error("Invalid action", **base_ctx)
             return {
                 'statusCode': 400,
                 'body': json.dumps({
@@ -570,10 +658,10 @@ def lambda_handler(event, context):
                 })
             }
         
-        total_duration = (time.time() - start_time) * 1000
+        total_duration = int((time.time() - start_time) * 1000)
         log.info(f"Request completed successfully", 
-                action=action, 
-                total_duration_ms=round(total_duration, 2))
+                **base_ctx, 
+                total_duration_ms=total_duration)
         
         return {
             'statusCode': 200,
@@ -585,10 +673,10 @@ def lambda_handler(event, context):
         }
         
     except Exception as e:
-        total_duration = (time.time() - start_time) * 1000
+        total_duration = int((time.time() - start_time) * 1000)
         log.error(f"Request failed: {str(e)}", 
                  action=action if 'action' in locals() else "unknown",
-                 duration_ms=round(total_duration, 2),
+                 duration_ms=total_duration,
                  error_type=type(e).__name__)
         return {
             'statusCode': 500,
@@ -15,6 +15,7 @@ pip install requests -t $tempDir
 
 # Copy Lambda function
 Copy-Item lambda_function.py $tempDir/
+Copy-Item ../common/graph_items.py $tempDir/
 
 # Create zip
 Write-Host "Creating deployment package..." -ForegroundColor Yellow
@@ -3,16 +3,48 @@ ContribConnect Data Ingestion Lambda Function
 Fetches GitHub data and populates DynamoDB graph with adjacency list pattern
 """
 
+import gzip
+import hashlib
+import io
 import json
+import logging
 import os
+import queue
+import re
+import sys
+import threading
 import boto3
+from boto3.dynamodb.types import TypeSerializer, TypeDeserializer
+from botocore.exceptions import ClientError
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from urllib.parse import urlencode
 from datetime import datetime, timezone
 from typing import Dict, List, Any, Optional
 import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+# Node/edge shapes shared with scripts/comprehensive_scraper.py; packaged next
+# to this file, or found in lambda/common when run from the repo
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'common'))
+from graph_items import (
+    PR_BODY_MAX_CHARS, claim_label_bits, edge_item, file_node_data, issue_node_data,
+    label_mask, label_node_data, node_item, pr_node_data, user_edge_attributes, user_node_data
+)
+
+try:
+    import orjson
+except ImportError:  # fall back to stdlib json if the wheel isn't packaged
+    orjson = None
+
+# Level-gated logger; debug output is skipped entirely unless LOG_LEVEL=DEBUG
+logger = logging.getLogger(__name__)
+logger.setLevel(os.environ.get('LOG_LEVEL', 'INFO').upper())
 
 # Initialize AWS clients
-dynamodb = boto3.resource('dynamodb')
+ddb = boto3.client('dynamodb')  # low-level client for the node/edge write path
 s3 = boto3.client('s3')
 secrets_manager = boto3.client('secretsmanager')
 
@@ -23,36 +55,228 @@ REPOS_TABLE = os.environ.get('REPOS_TABLE', 'cc-repos-dev')
 RAW_BUCKET = os.environ.get('RAW_BUCKET', '')
 GITHUB_TOKEN_SECRET = os.environ.get('GITHUB_TOKEN_SECRET', 'cc-github-token')
 
-# DynamoDB tables
-nodes_table = dynamodb.Table(NODES_TABLE)
-edges_table = dynamodb.Table(EDGES_TABLE)
-repos_table = dynamodb.Table(REPOS_TABLE)
+# DynamoDB tables (nodes and edges are written through the low-level client).
+# boto3 resources aren't thread-safe and repos are ingested on worker threads,
+# so each thread builds its own repos Table (see get_repos_table)
+thread_resources = threading.local()
+serializer = TypeSerializer()
+deserializer = TypeDeserializer()
+
+# BatchWriteItem limits and retry policy for UnprocessedItems
+BATCH_WRITE_SIZE = 25
+BATCH_WRITE_MAX_RETRIES = 8
+
+# Raw payloads are uploaded to S3 by background workers off the ingest path
+S3_UPLOAD_WORKERS = 2
+s3_queue = queue.Queue()
+s3_workers = []
+s3_workers_lock = threading.Lock()
+S3_MULTIPART_THRESHOLD = 5 * 1024 * 1024
+# gzip's default level 9 costs several times the CPU of 6 for ~1% smaller JSON
+S3_GZIP_LEVEL = 6
+
+# Enabled repo list shared by warm invocations; the repos table is tiny and
+# `enabled` is a boolean (not indexable), so a cached projected scan is used
+ENABLED_REPOS_TTL_SECONDS = 60
+enabled_repos_cache = {'repos': None, 'expires': 0}
+
+# Enabled repos ingested in parallel per invocation
+REPO_WORKERS = 5
+
+# Digest of the payload last written for node types that rarely change, so
+# users/labels/files shared by the repos of one invocation aren't re-PUT.
+# Digests are recorded only once their write has succeeded, and cleared per
+# invocation because other writers (the scraper) can overwrite these nodes.
+# A conditional put would be cheaper still but BatchWriteItem can't carry one.
+STABLE_NODE_TYPES = frozenset({'user', 'label', 'file'})
+MAX_NODE_DIGESTS = 100_000
+written_node_digests = OrderedDict()
+
+# Caches that outlive one invocation are capped; the oldest writes are evicted
+warm_cache_lock = threading.Lock()
+
+# PRs between crash-resume checkpoints written to the repos table
+CHECKPOINT_INTERVAL = 50
+
+# Contributors are written in parallel chunks of this size
+CONTRIBUTOR_CHUNK_SIZE = 250
+CONTRIBUTOR_WORKERS = 4
+
+
+def bounded_put(cache: OrderedDict, key: Any, value: Any, max_entries: int) -> None:
+    """Insert into a warm-container cache, evicting the oldest entries past max_entries"""
+    with warm_cache_lock:
+        cache[key] = value
+        cache.move_to_end(key)
+        while len(cache) > max_entries:
+            cache.popitem(last=False)
+
+
+def get_repos_table():
+    """This thread's repos table resource, created on first use"""
+    if not hasattr(thread_resources, 'repos_table'):
+        thread_resources.repos_table = boto3.Session().resource('dynamodb').Table(REPOS_TABLE)
+    return thread_resources.repos_table
+
+
+def dumps_json(data: Any) -> bytes:
+    """Serialize to UTF-8 JSON bytes, preferring orjson"""
+    if orjson is not None:
+        return orjson.dumps(data, default=str)
+    return json.dumps(data, default=str).encode('utf-8')
+
+
+def loads_json(content: bytes) -> Any:
+    """Parse a JSON response body, preferring orjson"""
+    if orjson is not None:
+        return orjson.loads(content)
+    return json.loads(content)
+
+
+# (connect, read) timeouts for GitHub calls so a stalled socket can't hang
+# the invocation; large GraphQL pages can take several seconds to render
+GITHUB_TIMEOUT = (3, 30)
+
+# Keep-alive session so GitHub calls reuse TCP+TLS connections
+github_session = requests.Session()
+github_session.mount('https://', HTTPAdapter(
+    pool_connections=16,
+    pool_maxsize=32,
+    max_retries=Retry(total=3, backoff_factor=1, status_forcelist=[502, 503, 504], raise_on_status=False)
+))
+
+
+# Seconds a token read from Secrets Manager is reused by a warm container
+# before it is read again, so a rotated token is picked up
+GITHUB_TOKEN_TTL_SECONDS = 300
+github_token_cache = {'token': None, 'expires_at': 0.0}
+github_token_lock = threading.Lock()
+
+
+def fetch_github_token_secret() -> str:
+    """Read the token from Secrets Manager, reused for GITHUB_TOKEN_TTL_SECONDS (failures are not cached)"""
+    if github_token_cache['token'] and time.time() < github_token_cache['expires_at']:
+        return github_token_cache['token']
+    response = secrets_manager.get_secret_value(SecretId=GITHUB_TOKEN_SECRET)
+    token = json.loads(response['SecretString']).get('token', '')
+    if not token:
+        raise ValueError(f"no 'token' key in secret {GITHUB_TOKEN_SECRET}")
+    github_token_cache.update(token=token, expires_at=time.time() + GITHUB_TOKEN_TTL_SECONDS)
+    return token
 
 
 def get_github_token() -> str:
     """Retrieve GitHub token from Secrets Manager"""
     try:
-        response = secrets_manager.get_secret_value(SecretId=GITHUB_TOKEN_SECRET)
-        secret = json.loads(response['SecretString'])
-        return secret.get('token', '')
+        return fetch_github_token_secret()
     except Exception as e:
-        print(f"Warning: Could not retrieve GitHub token: {e}")
+        logger.warning("Warning: Could not retrieve GitHub token: %s", e)
         return os.environ.get('GITHUB_TOKEN', '')
 
 
-def check_rate_limit(token: str) -> Dict:
-    """Check remaining GitHub API rate limit"""
-    headers = {
+GITHUB_GRAPHQL_URL = 'https://api.github.com/graphql'
+
+# ETag + payload of previous GitHub responses, keyed by request URL. Kept in
+# memory across warm invocations and persisted to S3 so 304 Not Modified
+# responses (which don't count against the rate limit) can be served later.
+# The raw bucket's lifecycle rule expires the S3 copies after 7 days
+ETAG_CACHE_PREFIX = 'etag-cache'
+MAX_ETAG_ENTRIES = 128
+etag_cache = OrderedDict()
+
+# Next-page URL in a GitHub Link header
+NEXT_LINK_RE = re.compile(r'<([^>]+)>;\s*rel="next"')
+
+# Pull requests with their comments, reviews and files, newest first
+PULL_REQUESTS_QUERY = """
+query($owner: String!, $name: String!, $cursor: String) {
+  repository(owner: $owner, name: $name) {
+    pullRequests(first: 25, after: $cursor, orderBy: {field: CREATED_AT, direction: DESC}) {
+      totalCount
+      pageInfo { hasNextPage endCursor }
+      nodes {
+        number title body state merged isDraft url
+        createdAt updatedAt closedAt mergedAt
+        additions deletions changedFiles
+        baseRefName headRefName
+        commits { totalCount }
+        author { login url avatarUrl }
+        comments(first: 100) {
+          nodes { databaseId body createdAt url author { login url avatarUrl } }
+        }
+        reviews(first: 100) {
+          nodes { databaseId state body submittedAt author { login url avatarUrl } }
+        }
+        files(first: 100) {
+          nodes { path additions deletions changeType }
+        }
+      }
+    }
+  }
+}
+"""
+
+# PR numbers and cursors only, used to skip past already-processed PRs cheaply
+PR_NUMBERS_QUERY = """
+query($owner: String!, $name: String!, $cursor: String) {
+  repository(owner: $owner, name: $name) {
+    pullRequests(first: 100, after: $cursor, orderBy: {field: CREATED_AT, direction: DESC}) {
+      pageInfo { hasNextPage endCursor }
+      edges { cursor node { number } }
+    }
+  }
+}
+"""
+
+# GitHub rate-limit budget per resource (core, graphql, ...), refreshed
+# from the headers of every response. Repo threads share it; each entry is
+# replaced whole and never removed, so reads need no lock
+rate_limit_state = {}
+
+# Below this many remaining calls, paginated fetches spread the rest of the
+# budget evenly over the rate-limit window instead of running at wire speed
+GITHUB_PACING_THRESHOLD = 500
+
+
+def configure_github_session(token: str) -> None:
+    """Set auth headers once on the shared session instead of per request"""
+    github_session.headers.update({
         'Authorization': f'token {token}',
         'Accept': 'application/vnd.github.v3+json'
-    }
+    })
+
+
+def refresh_github_token(response: requests.Response) -> bool:
+    """
+    After a 401, re-read the token from Secrets Manager and put it on the
+    session; returns whether the request should be retried with a new token
+    """
+    rejected = response.request.headers.get('Authorization')
+    with github_token_lock:
+        if github_session.headers.get('Authorization') != rejected:
+            return True  # another request already picked up the new token
+        github_token_cache['expires_at'] = 0.0
+        try:
+            token = fetch_github_token_secret()
+        except Exception as e:
+            logger.warning("Could not re-read GitHub token after a 401: %s", e)
+            return False
+        if f'token {token}' == rejected:
+            return False
+        configure_github_session(token)
+    logger.info("🔑 GitHub token refreshed after a 401")
+    return True
+
+
+def check_rate_limit(token: str, resource: str = 'core') -> Dict:
+    """Check remaining GitHub API rate limit"""
     try:
-        response = requests.get('https://api.github.com/rate_limit', headers=headers)
+        response = github_session.get('https://api.github.com/rate_limit', timeout=GITHUB_TIMEOUT)
         if response.status_code == 200:
-            data = response.json()
-            remaining = data['resources']['core']['remaining']
-            limit = data['resources']['core']['limit']
-            reset_time = data['resources']['core']['reset']
+            data = loads_json(response.content)
+            remaining = data['resources'][resource]['remaining']
+            limit = data['resources'][resource]['limit']
+            reset_time = data['resources'][resource]['reset']
             
             return {
                 'remaining': remaining,
@@ -61,23 +285,84 @@ def check_rate_limit(token: str) -> Dict:
                 'percentage': (remaining / limit) * 100 if limit > 0 else 0
             }
     except Exception as e:
-        print(f"Error checking rate limit: {e}")
+        logger.error("Error checking rate limit: %s", e)
     
     return {'remaining': 5000, 'limit': 5000, 'reset_time': 0, 'percentage': 100}
 
 
-def wait_if_rate_limited(token: str, min_remaining: int = 100):
-    """Wait if rate limit is too low"""
-    rate_limit = check_rate_limit(token)
+def track_rate_limit(response: requests.Response) -> None:
+    """Record the rate-limit budget GitHub reports on every response"""
+    remaining = response.headers.get('X-RateLimit-Remaining')
+    if remaining is None:
+        return
+    rate_limit_state[response.headers.get('X-RateLimit-Resource', 'core')] = {
+        'remaining': int(remaining),
+        'limit': int(response.headers.get('X-RateLimit-Limit', 5000)),
+        'reset_time': int(response.headers.get('X-RateLimit-Reset', 0))
+    }
+
+
+def rate_limit_too_low(min_remaining: int, resource: str = 'core') -> bool:
+    """
+    True when the tracked budget is below min_remaining and the window has not
+    reset yet (a budget reported before the reset time is stale)
+    """
+    state = rate_limit_state.get(resource)
+    if not state:
+        return False
+    return state['remaining'] < min_remaining and state['reset_time'] > int(time.time())
+
+
+def pacing_delay(elapsed: float, resource: str = 'core') -> float:
+    """Seconds to sleep before the next paginated call (0 while the budget is healthy)"""
+    state = rate_limit_state.get(resource)
+    if not state or state['remaining'] >= GITHUB_PACING_THRESHOLD:
+        return 0.0
+    window = state['reset_time'] - time.time()
+    if window <= 0:
+        return 0.0
+    return max(0.0, window / max(state['remaining'], 1) - elapsed)
+
+
+def wait_if_rate_limited(token: str, min_remaining: int = 100, resource: str = 'core'):
+    """Wait if rate limit is too low, using the budget tracked from response headers"""
+    state = rate_limit_state.get(resource)
+    if state is None:
+        # Nothing tracked yet: seed once from the rate_limit endpoint
+        rate_limit = check_rate_limit(token, resource)
+        state = rate_limit_state.setdefault(resource, {k: rate_limit[k] for k in ('remaining', 'limit', 'reset_time')})
     
-    print(f"Rate limit: {rate_limit['remaining']}/{rate_limit['limit']} ({rate_limit['percentage']:.1f}%)")
+    remaining = state['remaining']
+    limit = state['limit']
+    percentage = (remaining / limit) * 100 if limit else 0
+    logger.info("Rate limit (%s): %s/%s (%.1f%%)", resource, remaining, limit, percentage)
     
-    if rate_limit['remaining'] < min_remaining:
-        wait_time = rate_limit['reset_time'] - int(time.time())
-        if wait_time > 0:
-            print(f"⚠️ Rate limit low ({rate_limit['remaining']} remaining)")
-            print(f"   Waiting {wait_time} seconds until reset...")
-            time.sleep(wait_time + 10)
+    if rate_limit_too_low(min_remaining, resource):
+        wait_time = state['reset_time'] - int(time.time())
+        logger.warning("⚠️ Rate limit low (%s remaining)", remaining)
+        logger.info("   Waiting %s seconds until reset...", wait_time)
+        time.sleep(wait_time + 10)
+
+
+def is_rate_limited(response: requests.Response) -> bool:
+    """Primary (403 with no budget left) or secondary (403/429 with Retry-After) rate limit"""
+    if response.status_code not in (403, 429):
+        return False
+    return ('Retry-After' in response.headers
+            or response.headers.get('X-RateLimit-Remaining') == '0'
+            or 'rate limit' in response.text.lower())
+
+
+def rate_limit_wait_seconds(response: requests.Response) -> int:
+    """Seconds to back off after a rate limited response, taken from its headers"""
+    retry_after = response.headers.get('Retry-After')
+    if retry_after and retry_after.isdigit():
+        return int(retry_after)
+    if response.headers.get('X-RateLimit-Remaining') == '0':
+        reset_time = int(response.headers.get('X-RateLimit-Reset', 0))
+        return max(reset_time - int(time.time()), 1)
+    # Secondary limit without a hint: GitHub asks for at least a minute
+    return 60
 
 
 def parse_next_link(link_header: str) -> Optional[str]:
@@ -88,43 +373,86 @@ def parse_next_link(link_header: str) -> Optional[str]:
     if not link_header:
         return None
     
-    links = link_header.split(',')
-    for link in links:
-        if 'rel="next"' in link:
-            # Extract URL between < and >
-            start = link.find('<')
-            end = link.find('>')
-            if start != -1 and end != -1:
-                return link[start + 1:end]
+    match = NEXT_LINK_RE.search(link_header)
+    return match.group(1) if match else None
+
+
+def etag_cache_key(url: str, params: Optional[Dict] = None) -> str:
+    """Stable cache key for a GitHub request"""
+    return f"{url}?{urlencode(sorted(params.items()))}" if params else url
+
+
+def get_cached_response(cache_key: str) -> Optional[Dict]:
+    """Return the cached {'etag', 'payload'} for a request, checking memory then S3"""
+    # A single get; another repo thread may evict the key between an `in` check and a lookup
+    cached = etag_cache.get(cache_key)
+    if cached is not None:
+        return cached
+    if not RAW_BUCKET:
+        return None
     
-    return None
+    s3_key = f"{ETAG_CACHE_PREFIX}/{hashlib.sha1(cache_key.encode('utf-8')).hexdigest()}.json"
+    try:
+        obj = s3.get_object(Bucket=RAW_BUCKET, Key=s3_key)
+        cached = loads_json(gzip.decompress(obj['Body'].read()))
+    except ClientError as e:
+        # A miss is NoSuchKey, or AccessDenied when the role can't list the bucket
+        if e.response.get('Error', {}).get('Code') not in ('NoSuchKey', 'AccessDenied'):
+            logger.warning("Could not read ETag cache for %s: %s", cache_key, e)
+        return None
+    except Exception as e:
+        logger.warning("Could not read ETag cache for %s: %s", cache_key, e)
+        return None
+    
+    bounded_put(etag_cache, cache_key, cached, MAX_ETAG_ENTRIES)
+    return cached
+
+
+def store_cached_response(cache_key: str, etag: str, payload: Any) -> None:
+    """Remember a response's ETag and payload for later conditional requests"""
+    cached = {'etag': etag, 'payload': payload}
+    bounded_put(etag_cache, cache_key, cached, MAX_ETAG_ENTRIES)
+    save_to_s3(cached, f"{ETAG_CACHE_PREFIX}/{hashlib.sha1(cache_key.encode('utf-8')).hexdigest()}.json")
 
 
 def github_request(url: str, token: str, params: Optional[Dict] = None, paginate: bool = False) -> Any:
     """Make authenticated GitHub API request with rate limit handling and optional pagination"""
-    headers = {
-        'Authorization': f'token {token}',
-        'Accept': 'application/vnd.github.v3+json'
-    }
-    
     # If pagination is not requested, use original single-request logic
     if not paginate:
+        cache_key = etag_cache_key(url, params)
+        cached = get_cached_response(cache_key)
+        conditional_headers = {'If-None-Match': cached['etag']} if cached else None
+        
         max_retries = 3
+        token_refreshed = False
         for attempt in range(max_retries):
-            response = requests.get(url, headers=headers, params=params)
+            response = github_session.get(url, params=params, headers=conditional_headers, timeout=GITHUB_TIMEOUT)
+            track_rate_limit(response)
             
-            if response.status_code == 200:
-                return response.json()
-            elif response.status_code == 403 and 'rate limit' in response.text.lower():
-                reset_time = int(response.headers.get('X-RateLimit-Reset', 0))
-                wait_time = max(reset_time - int(time.time()), 60)
-                print(f"Rate limited. Waiting {wait_time} seconds...")
+            if response.status_code == 401 and not token_refreshed:
+                # One re-read of the secret per request, in case the token was rotated
+                token_refreshed = True
+                if refresh_github_token(response):
+                    continue
+            
+            if response.status_code == 304:
+                logger.debug("Not modified: %s", url)
+                return cached['payload']
+            elif response.status_code == 200:
+                payload = loads_json(response.content)
+                etag = response.headers.get('ETag')
+                if etag:
+                    store_cached_response(cache_key, etag, payload)
+                return payload
+            elif is_rate_limited(response):
+                wait_time = rate_limit_wait_seconds(response)
+                logger.warning("Rate limited. Waiting %s seconds...", wait_time)
                 time.sleep(wait_time)
             elif response.status_code == 404:
-                print(f"Resource not found: {url}")
+                logger.info("Resource not found: %s", url)
                 return {}
             else:
-                print(f"GitHub API error: {response.status_code} - {response.text}")
+                logger.error("GitHub API error: %s - %s", response.status_code, response.text)
                 if attempt < max_retries - 1:
                     time.sleep(2 ** attempt)
                 else:
@@ -137,16 +465,24 @@ def github_request(url: str, token: str, params: Optional[Dict] = None, paginate
     current_url = url
     page_count = 0
     max_retries = 3
+    token_refreshed = False
     
     while current_url:
         page_count += 1
-        print(f"  Fetching page {page_count}...")
+        logger.info("  Fetching page %s...", page_count)
         
+        page_started = time.time()
         for attempt in range(max_retries):
-            response = requests.get(current_url, headers=headers, params=params if page_count == 1 else None)
+            response = github_session.get(current_url, params=params if page_count == 1 else None, timeout=GITHUB_TIMEOUT)
+            track_rate_limit(response)
+            
+            if response.status_code == 401 and not token_refreshed:
+                token_refreshed = True
+                if refresh_github_token(response):
+                    continue
             
             if response.status_code == 200:
-                data = response.json()
+                data = loads_json(response.content)
                 if isinstance(data, list):
                     all_results.extend(data)
                 else:
@@ -156,122 +492,439 @@ def github_request(url: str, token: str, params: Optional[Dict] = None, paginate
                 link_header = response.headers.get('Link', '')
                 current_url = parse_next_link(link_header)
                 
-                # Rate limiting between pages
+                # Pace pages only when the remaining budget is running low
                 if current_url:
-                    time.sleep(0.5)
+                    delay = pacing_delay(time.time() - page_started)
+                    if delay:
+                        time.sleep(delay)
                 
                 break  # Success, exit retry loop
                 
-            elif response.status_code == 403 and 'rate limit' in response.text.lower():
-                reset_time = int(response.headers.get('X-RateLimit-Reset', 0))
-                wait_time = max(reset_time - int(time.time()), 60)
-                print(f"Rate limited. Waiting {wait_time} seconds...")
+            elif is_rate_limited(response):
+                wait_time = rate_limit_wait_seconds(response)
+                logger.warning("Rate limited. Waiting %s seconds...", wait_time)
                 time.sleep(wait_time)
             elif response.status_code == 404:
-                print(f"Resource not found: {current_url}")
+                logger.info("Resource not found: %s", current_url)
                 return all_results
             else:
-                print(f"GitHub API error: {response.status_code} - {response.text}")
+                logger.error("GitHub API error: %s - %s", response.status_code, response.text)
                 if attempt < max_retries - 1:
                     time.sleep(2 ** attempt)
                 else:
-                    print(f"Failed to fetch page {page_count} after {max_retries} attempts")
+                    logger.error("Failed to fetch page %s after %s attempts", page_count, max_retries)
                     return all_results
     
     return all_results
 
 
-def save_to_s3(data: Any, key: str) -> None:
-    """Save raw data to S3"""
+def graphql_request(query: str, variables: Dict, token: str) -> Dict:
+    """Run a GitHub GraphQL query with the same retry and rate limit handling as github_request"""
+    max_retries = 3
+    token_refreshed = False
+    for attempt in range(max_retries):
+        response = github_session.post(GITHUB_GRAPHQL_URL, json={'query': query, 'variables': variables},
+                                       timeout=GITHUB_TIMEOUT)
+        track_rate_limit(response)
+        
+        if response.status_code == 401 and not token_refreshed:
+            token_refreshed = True
+            if refresh_github_token(response):
+                continue
+        
+        if response.status_code == 200:
+            payload = loads_json(response.content)
+            if payload.get('errors'):
+                raise Exception(f"GitHub GraphQL error: {payload['errors'][0].get('message')}")
+            return payload.get('data') or {}
+        elif is_rate_limited(response):
+            wait_time = rate_limit_wait_seconds(response)
+            logger.warning("Rate limited. Waiting %s seconds...", wait_time)
+            time.sleep(wait_time)
+        else:
+            logger.error("GitHub GraphQL error: %s - %s", response.status_code, response.text)
+            if attempt < max_retries - 1:
+                time.sleep(2 ** attempt)
+            else:
+                raise Exception(f"GitHub GraphQL request failed: {response.status_code}")
+    
+    return {}
+
+
+def s3_upload_worker() -> None:
+    """Upload queued raw payloads to S3 as gzipped JSON (or JSON Lines for record lists)"""
+    while True:
+        data, key, jsonl = s3_queue.get()
+        try:
+            if jsonl:
+                body = gzip.compress(b''.join(dumps_json(record) + b'\n' for record in data), compresslevel=S3_GZIP_LEVEL)
+                content_type = 'application/x-ndjson'
+            else:
+                body = gzip.compress(dumps_json(data), compresslevel=S3_GZIP_LEVEL)
+                content_type = 'application/json'
+            
+            extra_args = {'ContentType': content_type, 'ContentEncoding': 'gzip'}
+            if len(body) >= S3_MULTIPART_THRESHOLD:
+                s3.upload_fileobj(io.BytesIO(body), RAW_BUCKET, key, ExtraArgs=extra_args)
+            else:
+                s3.put_object(Bucket=RAW_BUCKET, Key=key, Body=body, **extra_args)
+        except Exception as e:
+            logger.error("Error saving to S3: %s", e)
+        finally:
+            s3_queue.task_done()
+
+
+def save_to_s3(data: Any, key: str, jsonl: bool = False) -> None:
+    """
+    Queue raw data for a background S3 upload (see flush_s3_uploads).
+    With jsonl=True, data is a list of records written as one JSON Lines object.
+    """
     if not RAW_BUCKET:
         return
     
-    try:
-        s3.put_object(
-            Bucket=RAW_BUCKET,
-            Key=key,
-            Body=json.dumps(data, default=str),
-            ContentType='application/json'
-        )
-    except Exception as e:
-        print(f"Error saving to S3: {e}")
+    with s3_workers_lock:
+        if not s3_workers:
+            for _ in range(S3_UPLOAD_WORKERS):
+                worker = threading.Thread(target=s3_upload_worker, daemon=True)
+                worker.start()
+                s3_workers.append(worker)
+    
+    s3_queue.put((data, key, jsonl))
+
+
+def flush_s3_uploads() -> None:
+    """Block until every queued S3 upload has finished"""
+    s3_queue.join()
+
+
+def serialize_item(item: Dict) -> Dict:
+    """Convert a plain item into DynamoDB attribute values for the low-level client"""
+    return {key: serializer.serialize(value) for key, value in item.items()}
+
+
+class BatchWriter:
+    """
+    Buffers puts for one table and sends them with BatchWriteItem in chunks of
+    25, retrying UnprocessedItems with exponential backoff. A put with the
+    same key as a buffered one replaces it. Flushes when the block exits.
+    
+    seen holds the keys (see item_key) upsert_node/upsert_edge have already
+    sent through this writer; pass a shared set to de-duplicate across
+    writers. Node digests put alongside an item reach written_node_digests
+    only after the batch carrying it has been written.
+    
+    Items still unprocessed after the retries are never raised to whichever
+    upsert triggered the flush: their keys are logged, dropped from seen so
+    a later upsert can retry them, and collected in unprocessed.
+    """
+    
+    def __init__(self, table_name: str, key_names: List[str], seen: Optional[set] = None):
+        self.table_name = table_name
+        self.key_names = key_names
+        self.seen = seen if seen is not None else set()
+        self.buffer = {}
+        self.digests = {}
+        self.unprocessed = []
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.flush()
+        return False
+    
+    def item_key(self, Item: Dict) -> Any:
+        """Table key of a plain item: the bare value for one key attribute, else a tuple"""
+        if len(self.key_names) == 1:
+            return Item[self.key_names[0]]
+        return tuple(Item[name] for name in self.key_names)
+    
+    def put_item(self, Item: Dict, digest: Optional[bytes] = None) -> None:
+        key = self.item_key(Item)
+        self.buffer[key] = {'PutRequest': {'Item': serialize_item(Item)}}
+        if digest is not None:
+            self.digests[key] = digest
+        if len(self.buffer) >= BATCH_WRITE_SIZE:
+            self.flush()
+    
+    def flush(self) -> List[Any]:
+        """Write the buffer; returns the keys of items left unprocessed (empty on success)"""
+        if not self.buffer:
+            return []
+        requests_left = list(self.buffer.values())
+        digests = self.digests
+        self.buffer = {}
+        self.digests = {}
+        
+        try:
+            for attempt in range(BATCH_WRITE_MAX_RETRIES):
+                if attempt:
+                    time.sleep(min(0.05 * (2 ** attempt), 5))
+                response = ddb.batch_write_item(RequestItems={self.table_name: requests_left})
+                requests_left = (response.get('UnprocessedItems') or {}).get(self.table_name, [])
+                if not requests_left:
+                    break
+        except Exception as e:
+            logger.error("BatchWriteItem on %s failed: %s", self.table_name, e)
+        
+        failed = [
+            self.item_key({name: deserializer.deserialize(request['PutRequest']['Item'][name]) for name in self.key_names})
+            for request in requests_left
+        ]
+        for key in failed:
+            self.seen.discard(key)
+            digests.pop(key, None)
+        for node_id, digest in digests.items():
+            bounded_put(written_node_digests, node_id, digest, MAX_NODE_DIGESTS)
+        
+        if failed:
+            with warm_cache_lock:
+                for key in failed:
+                    written_node_digests.pop(key, None)
+            self.unprocessed.extend(failed)
+            logger.error("❌ %s items left unprocessed in %s: %s", len(failed), self.table_name, failed)
+        return failed
+
+
+def node_writer(seen: Optional[set] = None) -> BatchWriter:
+    """Batch writer for the nodes table"""
+    return BatchWriter(NODES_TABLE, ['nodeId'], seen)
 
 
-def upsert_node(node_id: str, node_type: str, data: Dict) -> None:
-    """Upsert a node in DynamoDB"""
+def edge_writer(seen: Optional[set] = None) -> BatchWriter:
+    """Batch writer for the edges table"""
+    return BatchWriter(EDGES_TABLE, ['fromId', 'toIdEdgeType'], seen)
+
+
+def upsert_node(node_id: str, node_type: str, data: Dict, writer=None,
+                updated_at: Optional[str] = None) -> None:
+    """Upsert a node in DynamoDB, buffered through writer when one is given"""
+    if writer:
+        if node_id in writer.seen:
+            return
+        writer.seen.add(node_id)
+    
+    digest = None
+    if node_type in STABLE_NODE_TYPES:
+        digest = hashlib.blake2b(dumps_json(data), digest_size=16).digest()
+        if written_node_digests.get(node_id) == digest:
+            return
+    
     try:
-        nodes_table.put_item(
-            Item={
-                'nodeId': node_id,
-                'nodeType': node_type,
-                'data': data,
-                'updatedAt': datetime.now(timezone.utc).isoformat()
-            }
-        )
+        item = node_item(node_id, node_type, data, updated_at)
+        if writer:
+            writer.put_item(Item=item, digest=digest)
+        else:
+            ddb.put_item(TableName=NODES_TABLE, Item=serialize_item(item))
+            if digest is not None:
+                bounded_put(written_node_digests, node_id, digest, MAX_NODE_DIGESTS)
     except Exception as e:
-        print(f"Error upserting node {node_id}: {e}")
+        logger.error("Error upserting node %s: %s", node_id, e)
 
 
-def upsert_edge(from_id: str, to_id: str, edge_type: str, properties: Optional[Dict] = None) -> None:
-    """Upsert an edge in DynamoDB"""
+def upsert_edge(from_id: str, to_id: str, edge_type: str, properties: Optional[Dict] = None,
+                attributes: Optional[Dict] = None, writer=None,
+                updated_at: Optional[str] = None) -> None:
+    """Upsert an edge in DynamoDB, buffered through writer when one is given"""
+    if writer:
+        edge_key = (from_id, f"{to_id}#{edge_type}")
+        if edge_key in writer.seen:
+            return
+        writer.seen.add(edge_key)
+    
     try:
-        edges_table.put_item(
-            Item={
-                'fromId': from_id,
-                'toIdEdgeType': f"{to_id}#{edge_type}",
-                'toId': to_id,
-                'fromIdEdgeType': f"{from_id}#{edge_type}",
-                'edgeType': edge_type,
-                'properties': properties or {},
-                'updatedAt': datetime.now(timezone.utc).isoformat()
-            }
-        )
+        item = edge_item(from_id, to_id, edge_type, properties, attributes, updated_at)
+        if writer:
+            writer.put_item(Item=item)
+        else:
+            ddb.put_item(TableName=EDGES_TABLE, Item=serialize_item(item))
     except Exception as e:
-        print(f"Error upserting edge {from_id} -> {to_id}: {e}")
+        logger.error("Error upserting edge %s -> %s: %s", from_id, to_id, e)
+
+
+def graphql_user(actor: Optional[Dict]) -> Dict:
+    """Reshape a GraphQL actor into the REST user shape"""
+    if not actor:
+        return {}
+    return {
+        'login': actor.get('login'),
+        'html_url': actor.get('url'),
+        'avatar_url': actor.get('avatarUrl')
+    }
+
+
+def pr_from_graphql(node: Dict) -> tuple:
+    """
+    Reshape a GraphQL pull request node into the REST payloads the ingestion
+    code consumes: (pr, comments, reviews, files)
+    """
+    pr = {
+        'number': node.get('number'),
+        'title': node.get('title'),
+        'body': (node.get('body') or '')[:PR_BODY_MAX_CHARS],
+        'state': 'open' if node.get('state') == 'OPEN' else 'closed',
+        'merged': node.get('merged', False),
+        'draft': node.get('isDraft', False),
+        'created_at': node.get('createdAt'),
+        'updated_at': node.get('updatedAt'),
+        'closed_at': node.get('closedAt'),
+        'merged_at': node.get('mergedAt'),
+        'html_url': node.get('url'),
+        'additions': node.get('additions', 0),
+        'deletions': node.get('deletions', 0),
+        'changed_files': node.get('changedFiles', 0),
+        'commits': (node.get('commits') or {}).get('totalCount', 0),
+        'base': {'ref': node.get('baseRefName')},
+        'head': {'ref': node.get('headRefName')},
+        'user': graphql_user(node.get('author'))
+    }
+    comments = [
+        {
+            'id': c.get('databaseId'),
+            'user': graphql_user(c.get('author')),
+            'body': c.get('body'),
+            'created_at': c.get('createdAt'),
+            'html_url': c.get('url')
+        }
+        for c in (node.get('comments') or {}).get('nodes') or []
+    ]
+    reviews = [
+        {
+            'id': r.get('databaseId'),
+            'user': graphql_user(r.get('author')),
+            'state': r.get('state'),
+            'body': r.get('body'),
+            'submitted_at': r.get('submittedAt')
+        }
+        for r in (node.get('reviews') or {}).get('nodes') or []
+    ]
+    files = [
+        {
+            'filename': f.get('path'),
+            'additions': f.get('additions', 0),
+            'deletions': f.get('deletions', 0),
+            'status': 'removed' if f.get('changeType') == 'DELETED' else (f.get('changeType') or '').lower()
+        }
+        for f in (node.get('files') or {}).get('nodes') or []
+    ]
+    return pr, comments, reviews, files
+
+
+def fetch_pr_page(org: str, repo: str, token: str, cursor: Optional[str]) -> Dict:
+    """Fetch one GraphQL page of pull requests, pacing first if the budget is low"""
+    delay = pacing_delay(0.0, 'graphql')
+    if delay:
+        time.sleep(delay)
+    data = graphql_request(PULL_REQUESTS_QUERY, {'owner': org, 'name': repo, 'cursor': cursor}, token)
+    return (data.get('repository') or {}).get('pullRequests') or {}
+
+
+def find_resume_cursor(org: str, repo: str, token: str, last_processed_pr: int, stats: Dict) -> tuple:
+    """
+    Walk PR numbers only (no comments/reviews/files) down to the checkpoint.
+    PRs are newest first and everything >= last_processed_pr is already done.
+    
+    Returns:
+        (cursor, has_more): cursor to resume the full query after, and whether
+        any unprocessed PRs remain
+    """
+    cursor = None
+    while True:
+        data = graphql_request(PR_NUMBERS_QUERY, {'owner': org, 'name': repo, 'cursor': cursor}, token)
+        stats['api_calls'] += 1
+        connection = (data.get('repository') or {}).get('pullRequests') or {}
+        
+        for edge in connection.get('edges') or []:
+            if edge['node']['number'] < last_processed_pr:
+                return cursor, True
+            stats['prs_skipped'] += 1
+            cursor = edge['cursor']
+        
+        if not (connection.get('pageInfo') or {}).get('hasNextPage'):
+            return cursor, False
+
+
+def iter_pull_requests(org: str, repo: str, token: str, stats: Dict, cursor: Optional[str] = None):
+    """
+    Yield (pr, comments, reviews, files) newest first, page by page, starting
+    after cursor. The next page is fetched in the background while the caller
+    is still processing the current one.
+    """
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        future = executor.submit(fetch_pr_page, org, repo, token, cursor)
+        page = 1
+        
+        while future:
+            connection = future.result()
+            stats['api_calls'] += 1
+            stats['prs_total'] = connection.get('totalCount', stats['prs_total'])
+            
+            nodes = connection.get('nodes') or []
+            page_info = connection.get('pageInfo') or {}
+            logger.info("  Page %s: %s PRs", page, len(nodes))
+            
+            future = None
+            if nodes and page_info.get('hasNextPage'):
+                future = executor.submit(fetch_pr_page, org, repo, token, page_info.get('endCursor'))
+                page += 1
+            
+            for node in nodes:
+                yield pr_from_graphql(node)
 
 
 def get_last_processed_pr(org: str, repo: str) -> int:
     """Get the last processed PR number from DynamoDB checkpoint"""
-    print(f"🔍 DEBUG: get_last_processed_pr called for {org}/{repo}")
+    logger.debug("get_last_processed_pr called for %s/%s", org, repo)
     try:
-        print(f"🔍 DEBUG: Querying repos_table with key: org={org}, repo={repo}")
-        response = repos_table.get_item(Key={'org': org, 'repo': repo})
-        print(f"🔍 DEBUG: get_item response: {response}")
+        logger.debug("Querying repos_table with key: org=%s, repo=%s", org, repo)
+        response = get_repos_table().get_item(Key={'org': org, 'repo': repo})
         if 'Item' in response:
             last_pr = response['Item'].get('lastProcessedPR', 0)
-            print(f"🔍 DEBUG: Found lastProcessedPR = {last_pr}")
+            logger.debug("Found lastProcessedPR = %s", last_pr)
             return last_pr
         else:
-            print(f"🔍 DEBUG: No item found for {org}/{repo}")
+            logger.debug("No item found for %s/%s", org, repo)
     except Exception as e:
-        print(f"❌ ERROR getting checkpoint: {e}")
-        import traceback
-        traceback.print_exc()
-    print(f"🔍 DEBUG: Returning 0 (no checkpoint)")
+        logger.exception("❌ ERROR getting checkpoint: %s", e)
+    logger.debug("Returning 0 (no checkpoint)")
     return 0
 
 
 def update_checkpoint(org: str, repo: str, pr_number: int):
     """Update the checkpoint with the last processed PR"""
     try:
-        print(f"DEBUG: Updating checkpoint for {org}/{repo} to PR #{pr_number}")
-        response = repos_table.update_item(
+        logger.debug("Updating checkpoint for %s/%s to PR #%s", org, repo, pr_number)
+        get_repos_table().update_item(
             Key={'org': org, 'repo': repo},
             UpdateExpression='SET lastProcessedPR = :pr, lastCheckpointAt = :now',
             ExpressionAttributeValues={
                 ':pr': pr_number,
                 ':now': datetime.now(timezone.utc).isoformat()
-            },
-            ReturnValues='ALL_NEW'
+            }
         )
-        print(f"DEBUG: Checkpoint updated successfully: {response.get('Attributes', {}).get('lastProcessedPR')}")
     except Exception as e:
-        print(f"Error updating checkpoint: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Error updating checkpoint: %s", e)
 
 
-def scrape_pull_requests_comprehensive(org: str, repo: str, token: str, repo_id: str) -> Dict:
+def get_label_index(org: str, repo: str, label_names: List[str]) -> Optional[Dict[str, int]]:
+    """
+    Get the repo's label -> bit position map used to build issue label masks,
+    with bits for label_names already saved; None means issues get no mask
+    """
+    try:
+        label_index = claim_label_bits(get_repos_table(), org, repo, label_names)
+    except Exception as e:
+        logger.error("Error claiming label bits: %s", e)
+        return None
+    if label_index is None:
+        logger.warning("⚠️ Label bits for %s/%s could not be saved; issues are written without label masks", org, repo)
+    return label_index
+
+
+def scrape_pull_requests_comprehensive(org: str, repo: str, token: str, repo_id: str,
+                                       seen_nodes: Optional[set] = None,
+                                       seen_edges: Optional[set] = None,
+                                       updated_at: Optional[str] = None) -> Dict:
     """
     Scrape ALL pull requests with full details (comments, reviews, files)
     Supports resume from last checkpoint
@@ -279,17 +932,18 @@ def scrape_pull_requests_comprehensive(org: str, repo: str, token: str, repo_id:
     Returns:
         stats: Dictionary with scraping statistics
     """
-    print(f"\n{'='*60}")
-    print(f"Starting Comprehensive PR Scraping for {org}/{repo}")
-    print(f"{'='*60}")
+    now_iso = updated_at or datetime.now(timezone.utc).isoformat()
+    logger.info("\n" + "=" * 60)
+    logger.info("Starting Comprehensive PR Scraping for %s/%s", org, repo)
+    logger.info("=" * 60)
     
     # Get last checkpoint
     last_processed_pr = get_last_processed_pr(org, repo)
     if last_processed_pr > 0:
-        print(f"📍 Resuming from checkpoint: PR #{last_processed_pr}")
-        print(f"   Will skip PRs >= #{last_processed_pr} and continue from PR #{last_processed_pr - 1}")
+        logger.info("📍 Resuming from checkpoint: PR #%s", last_processed_pr)
+        logger.info("   Will skip PRs >= #%s and continue from PR #%s", last_processed_pr, last_processed_pr - 1)
     else:
-        print(f"📍 No checkpoint found - starting from newest PR")
+        logger.info("📍 No checkpoint found - starting from newest PR")
     
     stats = {
         'prs_total': 0,
@@ -305,200 +959,219 @@ def scrape_pull_requests_comprehensive(org: str, repo: str, token: str, repo_id:
     }
     
     # Check initial rate limit
-    wait_if_rate_limited(token, min_remaining=500)
+    wait_if_rate_limited(token, min_remaining=500, resource='graphql')
     
-    # Fetch ALL PRs with pagination
-    print("\n📥 Fetching ALL Pull Requests...")
-    all_prs = []
-    page = 1
+    # On resume, skip the already-processed PRs without fetching their details
+    resume_cursor, has_more = None, True
+    if last_processed_pr > 0:
+        resume_cursor, has_more = find_resume_cursor(org, repo, token, last_processed_pr, stats)
+        logger.info("  Skipped %s already-processed PRs", stats['prs_skipped'])
     
-    while True:
-        pr_url = f"https://api.github.com/repos/{org}/{repo}/pulls"
-        params = {'state': 'all', 'per_page': 100, 'page': page, 'sort': 'created', 'direction': 'desc'}
-        
-        prs = github_request(pr_url, token, params)
-        stats['api_calls'] += 1
-        
-        if not isinstance(prs, list) or len(prs) == 0:
-            break
-        
-        all_prs.extend(prs)
-        print(f"  Page {page}: {len(prs)} PRs (total: {len(all_prs)})")
-        
-        if len(prs) < 100:
-            break
-        
-        page += 1
-        time.sleep(0.5)
+    # Stream PRs (with comments, reviews and files) page by page via GraphQL
+    logger.info("\n📥 Fetching Pull Requests...")
+    prs = iter_pull_requests(org, repo, token, stats, resume_cursor) if has_more else []
     
-    stats['prs_total'] = len(all_prs)
-    print(f"\n✓ Found {stats['prs_total']} total PRs")
+    # Id prefixes shared by every PR in this repo
+    repo_prefix = f"{org}/{repo}"
+    pr_id_prefix = f"pr#{repo_prefix}#"
+    file_id_prefix = f"file#{repo_prefix}#"
     
-    # Process each PR
-    for idx, pr in enumerate(all_prs, 1):
-        try:
-            pr_number = pr.get('number')
-            if not pr_number:
-                continue
-            
-            # Skip if already processed (resume logic)
-            # PRs are in descending order (newest first), so skip if pr_number >= last_processed_pr
-            if last_processed_pr > 0 and pr_number >= last_processed_pr:
-                stats['prs_skipped'] += 1
-                if stats['prs_skipped'] % 100 == 0:
-                    print(f"  Skipped {stats['prs_skipped']} already-processed PRs...")
-                continue
-            
-            print(f"\n[{idx}/{stats['prs_total']}] Processing PR #{pr_number}: {pr.get('title', '')[:50]}...")
-            
-            pr_id = f"pr#{org}/{repo}#{pr_number}"
-            
-            # Get user info
-            user_data = pr.get('user')
-            if not user_data or not user_data.get('login'):
-                print(f"  ⚠️ Skipping PR #{pr_number} - no user data")
+    # Writes are buffered across PRs so batches fill up; flushed before each checkpoint
+    with node_writer(seen_nodes) as nw, edge_writer(seen_edges) as ew:
+        # Process each PR as its page arrives
+        for idx, (pr, comments, reviews, files) in enumerate(prs, 1):
+            try:
+                pr_number = pr.get('number')
+                if not pr_number:
+                    continue
+                
+                # Skip if already processed (resume logic)
+                # PRs are in descending order (newest first), so skip if pr_number >= last_processed_pr
+                if last_processed_pr > 0 and pr_number >= last_processed_pr:
+                    stats['prs_skipped'] += 1
+                    if stats['prs_skipped'] % 100 == 0:
+                        logger.info("  Skipped %s already-processed PRs...", stats['prs_skipped'])
+                    continue
+                
+                logger.info("\n[%s/%s] Processing PR #%s: %s...", idx, stats['prs_total'], pr_number, pr.get('title', '')[:50])
+                
+                pr_id = pr_id_prefix + str(pr_number)
+                comment_id_prefix = f"comment#{repo_prefix}#pr#{pr_number}#comment#"
+                review_id_prefix = f"review#{repo_prefix}#pr#{pr_number}#review#"
+                
+                # Get user info
+                user_data = pr.get('user')
+                if not user_data or not user_data.get('login'):
+                    logger.warning("  ⚠️ Skipping PR #%s - no user data", pr_number)
+                    continue
+                
+                user_login = user_data.get('login')
+                user_id = f"user#{user_login}"
+                
+                # Create PR node with comprehensive data
+                upsert_node(pr_id, 'pull_request', pr_node_data(pr), writer=nw, updated_at=now_iso)
+                
+                # Create user node
+                upsert_node(user_id, 'user', user_node_data(user_data), writer=nw, updated_at=now_iso)
+                
+                # Create edges
+                upsert_edge(user_id, pr_id, 'AUTHORED', {'createdAt': pr.get('created_at')},
+                            user_edge_attributes(user_data), writer=ew, updated_at=now_iso)
+                upsert_edge(pr_id, repo_id, 'IN_REPO', writer=ew, updated_at=now_iso)
+                
+                # Process PR comments
+                if isinstance(comments, list):
+                    for comment in comments:
+                        comment_author = comment.get('user', {}).get('login')
+                        if comment_author:
+                            comment_id = f"{comment_id_prefix}{comment.get('id')}"
+                            upsert_node(comment_id, 'pr_comment', {
+                                'pr_number': pr_number,
+                                'author': comment_author,
+                                'body': (comment.get('body') or '')[:500],
+                                'created_at': comment.get('created_at'),
+                                'url': comment.get('html_url')
+                            }, writer=nw, updated_at=now_iso)
+                            upsert_edge(f"user#{comment_author}", comment_id, 'COMMENTED',
+                                        attributes=user_edge_attributes(comment['user']), writer=ew, updated_at=now_iso)
+                            upsert_edge(comment_id, pr_id, 'ON_PR', writer=ew, updated_at=now_iso)
+                            stats['comments'] += 1
+                
+                # Process PR reviews
+                if isinstance(reviews, list):
+                    for review in reviews:
+                        reviewer = review.get('user', {}).get('login')
+                        if reviewer:
+                            review_id = f"{review_id_prefix}{review.get('id')}"
+                            upsert_node(review_id, 'pr_review', {
+                                'pr_number': pr_number,
+                                'reviewer': reviewer,
+                                'state': review.get('state'),
+                                'body': (review.get('body') or '')[:500],
+                                'submitted_at': review.get('submitted_at')
+                            }, writer=nw, updated_at=now_iso)
+                            upsert_edge(f"user#{reviewer}", review_id, 'REVIEWED',
+                                        attributes=user_edge_attributes(review['user']), writer=ew, updated_at=now_iso)
+                            upsert_edge(review_id, pr_id, 'REVIEWS_PR', writer=ew, updated_at=now_iso)
+                            stats['reviews'] += 1
+                
+                # Process PR files
+                if isinstance(files, list):
+                    for file_data in files:
+                        filename = file_data.get('filename')
+                        if filename:
+                            file_id = file_id_prefix + filename
+                            upsert_node(file_id, 'file', file_node_data(filename), writer=nw, updated_at=now_iso)
+                            upsert_edge(pr_id, file_id, 'TOUCHES', {
+                                'additions': file_data.get('additions', 0),
+                                'deletions': file_data.get('deletions', 0),
+                                'status': file_data.get('status')
+                            }, writer=ew, updated_at=now_iso)
+                            stats['files'] += 1
+                
+                stats['prs_processed'] += 1
+                stats['last_pr_processed'] = pr_number  # Track the lowest PR number processed
+                
+                # Intermediate checkpoints only matter for crash resume; the final one is written below
+                if stats['prs_processed'] % CHECKPOINT_INTERVAL == 0:
+                    logger.info("  Progress: %s/%s PRs", stats['prs_processed'], stats['prs_total'])
+                    logger.info("  Stats: %s comments, %s reviews, %s files", stats['comments'], stats['reviews'], stats['files'])
+                    nw.flush()
+                    ew.flush()
+                    if nw.unprocessed or ew.unprocessed:
+                        logger.warning("  ⚠️ Checkpoint not advanced: earlier writes were left unprocessed")
+                    else:
+                        update_checkpoint(org, repo, pr_number)
+                        logger.info("  💾 Checkpoint saved at PR #%s", pr_number)
+                
+                if stats['prs_processed'] % 10 == 0:
+                    wait_if_rate_limited(token, min_remaining=100, resource='graphql')
+                
+            except Exception as e:
+                logger.error("  ❌ Error processing PR #%s: %s", pr.get('number', 'unknown'), e)
+                stats['errors'].append(f"PR #{pr.get('number')}: {str(e)}")
                 continue
-            
-            user_login = user_data.get('login')
-            user_id = f"user#{user_login}"
-            
-            # Create PR node with comprehensive data
-            pr_node_data = {
-                'number': pr_number,
-                'title': pr.get('title'),
-                'body': (pr.get('body') or '')[:1000],  # Limit to 1000 chars
-                'state': pr.get('state'),
-                'merged': pr.get('merged', False),
-                'draft': pr.get('draft', False),
-                'created_at': pr.get('created_at'),
-                'updated_at': pr.get('updated_at'),
-                'closed_at': pr.get('closed_at'),
-                'merged_at': pr.get('merged_at'),
-                'url': pr.get('html_url'),
-                'additions': pr.get('additions', 0),
-                'deletions': pr.get('deletions', 0),
-                'changed_files': pr.get('changed_files', 0),
-                'commits': pr.get('commits', 0),
-                'base_branch': pr.get('base', {}).get('ref'),
-                'head_branch': pr.get('head', {}).get('ref')
-            }
-            
-            upsert_node(pr_id, 'pull_request', pr_node_data)
-            
-            # Create user node
-            upsert_node(user_id, 'user', {
-                'login': user_login,
-                'url': user_data.get('html_url'),
-                'avatarUrl': user_data.get('avatar_url'),
-                'type': 'contributor'
-            })
-            
-            # Create edges
-            upsert_edge(user_id, pr_id, 'AUTHORED', {'createdAt': pr.get('created_at')})
-            upsert_edge(pr_id, repo_id, 'IN_REPO')
-            
-            # Fetch PR comments
-            comments_url = f"https://api.github.com/repos/{org}/{repo}/issues/{pr_number}/comments"
-            comments = github_request(comments_url, token, {'per_page': 100})
-            stats['api_calls'] += 1
-            
-            if isinstance(comments, list):
-                for comment in comments:
-                    comment_author = comment.get('user', {}).get('login')
-                    if comment_author:
-                        comment_id = f"comment#{org}/{repo}#pr#{pr_number}#comment#{comment.get('id')}"
-                        upsert_node(comment_id, 'pr_comment', {
-                            'pr_number': pr_number,
-                            'author': comment_author,
-                            'body': (comment.get('body') or '')[:500],
-                            'created_at': comment.get('created_at'),
-                            'url': comment.get('html_url')
-                        })
-                        upsert_edge(f"user#{comment_author}", comment_id, 'COMMENTED')
-                        upsert_edge(comment_id, pr_id, 'ON_PR')
-                        stats['comments'] += 1
-            
-            # Fetch PR reviews
-            reviews_url = f"https://api.github.com/repos/{org}/{repo}/pulls/{pr_number}/reviews"
-            reviews = github_request(reviews_url, token, {'per_page': 100})
-            stats['api_calls'] += 1
-            
-            if isinstance(reviews, list):
-                for review in reviews:
-                    reviewer = review.get('user', {}).get('login')
-                    if reviewer:
-                        review_id = f"review#{org}/{repo}#pr#{pr_number}#review#{review.get('id')}"
-                        upsert_node(review_id, 'pr_review', {
-                            'pr_number': pr_number,
-                            'reviewer': reviewer,
-                            'state': review.get('state'),
-                            'body': (review.get('body') or '')[:500],
-                            'submitted_at': review.get('submitted_at')
-                        })
-                        upsert_edge(f"user#{reviewer}", review_id, 'REVIEWED')
-                        upsert_edge(review_id, pr_id, 'REVIEWS_PR')
-                        stats['reviews'] += 1
-            
-            # Fetch PR files
-            files_url = f"https://api.github.com/repos/{org}/{repo}/pulls/{pr_number}/files"
-            files = github_request(files_url, token, {'per_page': 100})
-            stats['api_calls'] += 1
-            
-            if isinstance(files, list):
-                for file_data in files:
-                    filename = file_data.get('filename')
-                    if filename:
-                        file_id = f"file#{org}/{repo}#{filename}"
-                        upsert_node(file_id, 'file', {
-                            'path': filename,
-                            'directory': '/'.join(filename.split('/')[:-1]) if '/' in filename else ''
-                        })
-                        upsert_edge(pr_id, file_id, 'TOUCHES', {
-                            'additions': file_data.get('additions', 0),
-                            'deletions': file_data.get('deletions', 0),
-                            'status': file_data.get('status')
-                        })
-                        stats['files'] += 1
-            
-            stats['prs_processed'] += 1
-            stats['last_pr_processed'] = pr_number  # Track the lowest PR number processed
-            
-            # Save checkpoint every 10 PRs
-            if stats['prs_processed'] % 10 == 0:
-                print(f"  Progress: {stats['prs_processed']}/{stats['prs_total']} PRs")
-                print(f"  Stats: {stats['comments']} comments, {stats['reviews']} reviews, {stats['files']} files")
-                update_checkpoint(org, repo, pr_number)
-                print(f"  💾 Checkpoint saved at PR #{pr_number}")
-                wait_if_rate_limited(token, min_remaining=100)
-            
-        except Exception as e:
-            print(f"  ❌ Error processing PR #{pr.get('number', 'unknown')}: {e}")
-            stats['errors'].append(f"PR #{pr.get('number')}: {str(e)}")
-            continue
+    
+    # A PR whose writes failed must be re-ingested, so the checkpoint only
+    # moves when every write of the run went through
+    unprocessed = len(nw.unprocessed) + len(ew.unprocessed)
+    if unprocessed:
+        stats['errors'].append(f"{unprocessed} PR graph writes left unprocessed")
     
     # Save final checkpoint
-    if stats['prs_processed'] > 0 and 'last_pr_processed' in stats:
+    if stats['prs_processed'] > 0 and 'last_pr_processed' in stats and not unprocessed:
         last_pr = stats['last_pr_processed']
         update_checkpoint(org, repo, last_pr)
-        print(f"\n💾 Final checkpoint saved at PR #{last_pr}")
-    
-    print(f"\n{'='*60}")
-    print(f"PR Scraping Complete!")
-    print(f"{'='*60}")
-    print(f"PRs processed: {stats['prs_processed']}/{stats['prs_total']}")
-    print(f"PRs skipped (already done): {stats['prs_skipped']}")
-    print(f"Comments: {stats['comments']}")
-    print(f"Reviews: {stats['reviews']}")
-    print(f"Files: {stats['files']}")
-    print(f"API calls: {stats['api_calls']}")
-    print(f"Errors: {len(stats['errors'])}")
+        logger.info("\n💾 Final checkpoint saved at PR #%s", last_pr)
+    
+    logger.info("\n" + "=" * 60)
+    logger.info("PR Scraping Complete!")
+    logger.info("=" * 60)
+    logger.info("PRs processed: %s/%s", stats['prs_processed'], stats['prs_total'])
+    logger.info("PRs skipped (already done): %s", stats['prs_skipped'])
+    logger.info("Comments: %s", stats['comments'])
+    logger.info("Reviews: %s", stats['reviews'])
+    logger.info("Files: %s", stats['files'])
+    logger.info("API calls: %s", stats['api_calls'])
+    logger.info("Errors: %s", len(stats['errors']))
     
     return stats
 
 
+def ingest_contributor_chunk(chunk: List[Dict], repo_id: str, deadline: float,
+                             seen_nodes: Optional[set] = None, seen_edges: Optional[set] = None,
+                             updated_at: Optional[str] = None) -> int:
+    """
+    Write user nodes and CONTRIBUTES_TO edges for one chunk of contributors
+    
+    Returns:
+        Number of contributors written before the deadline
+    """
+    now_iso = updated_at or datetime.now(timezone.utc).isoformat()
+    written = 0
+    with node_writer(seen_nodes) as nw, edge_writer(seen_edges) as ew:
+        for contributor in chunk:
+            if time.time() > deadline:
+                break
+            
+            user_login = contributor.get('login')
+            user_id = f"user#{user_login}"
+            contributions = contributor.get('contributions', 0)
+            
+            # Create user node with contribution count
+            upsert_node(
+                user_id,
+                'user',
+                user_node_data(contributor, contributions),
+                writer=nw,
+                updated_at=now_iso
+            )
+            
+            # Create CONTRIBUTES_TO edge
+            upsert_edge(
+                user_id,
+                repo_id,
+                'CONTRIBUTES_TO',
+                {'contributions': contributions},
+                user_edge_attributes(contributor),
+                writer=ew,
+                updated_at=now_iso
+            )
+            
+            written += 1
+    
+    return written
+
+
 def ingest_repository(org: str, repo: str, token: str, cursor: str, mode: str = 'contributors') -> Dict:
     """Ingest data for a single repository"""
-    print(f"Ingesting {org}/{repo}...")
+    logger.info("Ingesting %s/%s...", org, repo)
+    
+    # Node ids and (fromId, toId, edgeType) keys already written during this
+    # run; users and files recur across many PRs. First write wins: contributors
+    # are ingested before PRs and issues, so user nodes keep their counts.
+    seen_nodes = set()
+    seen_edges = set()
     
     repo_id = f"repo#{org}/{repo}"
     stats = {
@@ -512,7 +1185,10 @@ def ingest_repository(org: str, repo: str, token: str, cursor: str, mode: str =
         'errors': []
     }
     
-    date_path = datetime.now(timezone.utc).strftime('%Y/%m/%d')
+    # One timestamp for every write in this run keeps updatedAt consistent per ingest
+    started_at = datetime.now(timezone.utc)
+    now_iso = started_at.isoformat()
+    date_path = started_at.strftime('%Y/%m/%d')
     
     # Fetch repository info
     repo_url = f"https://api.github.com/repos/{org}/{repo}"
@@ -534,7 +1210,8 @@ def ingest_repository(org: str, repo: str, token: str, cursor: str, mode: str =
             'stars': repo_data.get('stargazers_count', 0),
             'topics': repo_data.get('topics', []),
             'language': repo_data.get('language')
-        }
+        },
+        updated_at=now_iso
     )
     
     # Save raw repo data to S3
@@ -542,7 +1219,7 @@ def ingest_repository(org: str, repo: str, token: str, cursor: str, mode: str =
     
     # 1. FETCH ALL CONTRIBUTORS (if mode includes contributors)
     if mode in ['contributors', 'full']:
-        print(f"Fetching ALL contributors for {org}/{repo} (this may take a while)...")
+        logger.info("Fetching ALL contributors for %s/%s (this may take a while)...", org, repo)
         contributors_url = f"https://api.github.com/repos/{org}/{repo}/contributors"
         contributors = github_request(contributors_url, token, {'per_page': 100}, paginate=True)
     else:
@@ -550,275 +1227,229 @@ def ingest_repository(org: str, repo: str, token: str, cursor: str, mode: str =
     
     if isinstance(contributors, list) and mode in ['contributors', 'full']:
         stats['contributors_total'] = len(contributors)
-        print(f"Found {stats['contributors_total']} total contributors")
+        logger.info("Found %s total contributors", stats['contributors_total'])
         
         # Safety limits
         MAX_CONTRIBUTORS = 1000
         CONTRIBUTOR_TIMEOUT = 300  # 5 minutes
-        start_time = time.time()
+        deadline = time.time() + CONTRIBUTOR_TIMEOUT
         
+        # Skip bots and invalid users
+        users = []
         for contributor in contributors:
-            # Check timeout
-            if time.time() - start_time > CONTRIBUTOR_TIMEOUT:
-                print(f"⚠️ Contributor processing timeout after {stats['contributors']} contributors")
-                stats['errors'].append(f"Timeout after {stats['contributors']} contributors")
-                break
-            
-            # Check max limit
-            if stats['contributors'] >= MAX_CONTRIBUTORS:
-                print(f"⚠️ Reached max contributor limit ({MAX_CONTRIBUTORS})")
-                stats['errors'].append(f"Max contributor limit reached")
-                break
-            
-            user_login = contributor.get('login')
-            
-            # Skip bots and invalid users
-            if not user_login:
+            if not contributor.get('login'):
                 continue
-            
             if contributor.get('type') != 'User':
                 stats['bots_skipped'] += 1
                 continue
-                
-            user_id = f"user#{user_login}"
-            contributions = contributor.get('contributions', 0)
-            
-            # Create user node with contribution count
-            upsert_node(
-                user_id,
-                'user',
-                {
-                    'login': user_login,
-                    'url': contributor.get('html_url'),
-                    'avatarUrl': contributor.get('avatar_url'),
-                    'contributions': contributions,
-                    'type': 'contributor'
-                }
-            )
-            
-            # Create CONTRIBUTES_TO edge
-            upsert_edge(
-                user_id,
-                repo_id,
-                'CONTRIBUTES_TO',
-                {'contributions': contributions}
-            )
-            
-            stats['contributors'] += 1
-            
-            # Progress logging every 50 contributors
-            if stats['contributors'] % 50 == 0:
-                print(f"  Processed {stats['contributors']}/{stats['contributors_total']} contributors...")
-            
-            # Rate limiting every 10 contributors
-            if stats['contributors'] % 10 == 0:
-                time.sleep(0.3)
+            users.append(contributor)
+        
+        if len(users) > MAX_CONTRIBUTORS:
+            logger.warning("⚠️ Reached max contributor limit (%s)", MAX_CONTRIBUTORS)
+            stats['errors'].append(f"Max contributor limit reached")
+            users = users[:MAX_CONTRIBUTORS]
+        
+        # Contributor writes have no ordering requirement, so chunks are
+        # written concurrently, each through its own batch writers
+        chunks = [users[i:i + CONTRIBUTOR_CHUNK_SIZE] for i in range(0, len(users), CONTRIBUTOR_CHUNK_SIZE)]
+        with ThreadPoolExecutor(max_workers=CONTRIBUTOR_WORKERS) as executor:
+            futures = [executor.submit(ingest_contributor_chunk, chunk, repo_id, deadline, seen_nodes, seen_edges, now_iso) for chunk in chunks]
+            for future in futures:
+                stats['contributors'] += future.result()
+                logger.info("  Processed %s/%s contributors...", stats['contributors'], stats['contributors_total'])
         
-        print(f"Ingested {stats['contributors']} contributors ({stats['bots_skipped']} bots skipped)")
+        if stats['contributors'] < len(users):
+            logger.warning("⚠️ Contributor processing timeout after %s contributors", stats['contributors'])
+            stats['errors'].append(f"Timeout after {stats['contributors']} contributors")
+        
+        logger.info("Ingested %s contributors (%s bots skipped)", stats['contributors'], stats['bots_skipped'])
     
     # 2. FETCH PULL REQUESTS
     if mode in ['prs', 'full']:
         # Use comprehensive PR scraping
-        pr_stats = scrape_pull_requests_comprehensive(org, repo, token, repo_id)
+        pr_stats = scrape_pull_requests_comprehensive(org, repo, token, repo_id, seen_nodes, seen_edges, now_iso)
         stats.update(pr_stats)
     elif mode == 'contributors':
         # Skip PR scraping in contributors-only mode
-        print("Skipping PR scraping (contributors-only mode)")
-    else:
-        # Legacy: Basic PR scraping (for backward compatibility)
-        print(f"Fetching pull requests for {org}/{repo}...")
-        prs_url = f"https://api.github.com/repos/{org}/{repo}/pulls"
-        prs = github_request(prs_url, token, {'state': 'all', 'per_page': 50})
-    
-        if isinstance(prs, list):
-            for pr in prs[:30]:  # Limit to 30 PRs
-                try:
-                    pr_number = pr.get('number')
-                    if not pr_number:
-                        continue
-                        
-                    pr_id = f"pr#{org}/{repo}#{pr_number}"
-                    
-                    # Safely get user info
-                    user_data = pr.get('user')
-                    if not user_data:
-                        print(f"  ⚠️  PR #{pr_number} has no user data, skipping")
-                        continue
-                    
-                    user_login = user_data.get('login')
-                    if not user_login:
-                        print(f"  ⚠️  PR #{pr_number} user has no login, skipping")
-                        continue
-                    
-                    user_id = f"user#{user_login}"
-                    
-                    # Create PR node
-                    upsert_node(
-                        pr_id,
-                        'pull_request',
-                        {
-                            'number': pr_number,
-                            'title': pr.get('title'),
-                            'body': pr.get('body', '')[:500],
-                            'state': pr.get('state'),
-                            'merged': pr.get('merged', False),
-                            'createdAt': pr.get('created_at'),
-                            'url': pr.get('html_url'),
-                            'additions': pr.get('additions', 0),
-                            'deletions': pr.get('deletions', 0)
-                        }
-                    )
-                    
-                    # Create user node if not exists
-                    if user_login:
-                        upsert_node(
-                            user_id,
-                            'user',
-                            {
-                                'login': user_login,
-                                'url': user_data.get('html_url'),
-                                'avatarUrl': user_data.get('avatar_url'),
-                                'type': 'contributor'
-                            }
-                        )
-                        
-                        # Create AUTHORED edge
-                        upsert_edge(user_id, pr_id, 'AUTHORED', {'createdAt': pr.get('created_at')})
-                    
-                    # Create IN_REPO edge
-                    upsert_edge(pr_id, repo_id, 'IN_REPO')
-                    
-                    # Fetch PR files to create TOUCHES edges
-                    files_url = f"https://api.github.com/repos/{org}/{repo}/pulls/{pr_number}/files"
-                    files = github_request(files_url, token, {'per_page': 20})
-                    
-                    if isinstance(files, list):
-                        for file_data in files[:10]:  # Limit to 10 files per PR
-                            filename = file_data.get('filename')
-                            file_id = f"file#{org}/{repo}#{filename}"
-                            
-                            # Create file node
-                            upsert_node(
-                                file_id,
-                                'file',
-                                {
-                                    'path': filename,
-                                    'directory': '/'.join(filename.split('/')[:-1]) if '/' in filename else ''
-                                }
-                            )
-                            
-                            # Create TOUCHES edge
-                            upsert_edge(
-                                pr_id,
-                                file_id,
-                                'TOUCHES',
-                                {
-                                    'additions': file_data.get('additions', 0),
-                                    'deletions': file_data.get('deletions', 0)
-                                }
-                            )
-                            
-                            stats['files'] += 1
-                        
-                        stats['prs'] += 1
-                        save_to_s3(pr, f"github/{org}/{repo}/prs/{date_path}/pr-{pr_number}.json")
-                        
-                        time.sleep(0.5)  # Rate limiting
-                except Exception as e:
-                    print(f"  ❌ Error processing PR #{pr.get('number', 'unknown')}: {e}")
-                    import traceback
-                    traceback.print_exc()
-                    continue
+        logger.info("Skipping PR scraping (contributors-only mode)")
     
     # 3. FETCH ISSUES (separate from PRs)
-    print(f"Fetching issues for {org}/{repo}...")
+    logger.info("Fetching issues for %s/%s...", org, repo)
     issues_url = f"https://api.github.com/repos/{org}/{repo}/issues"
     issues = github_request(issues_url, token, {'state': 'all', 'per_page': 50})
     
     if isinstance(issues, list):
-        for issue in issues[:30]:  # Limit to 30 issues
-            # Skip pull requests (they appear in issues endpoint too)
-            if 'pull_request' in issue:
-                continue
+        # Bits for every label are saved before any mask that uses them is written
+        label_index = get_label_index(org, repo, [
+            label.get('name')
+            for issue in issues[:30] if 'pull_request' not in issue
+            for label in issue.get('labels') or []
+        ])
+        
+        raw_issues = []
+        with node_writer(seen_nodes) as nw, edge_writer(seen_edges) as ew:
+            for issue in issues[:30]:  # Limit to 30 issues
+                # Skip pull requests (they appear in issues endpoint too)
+                if 'pull_request' in issue:
+                    continue
+                    
+                issue_number = issue.get('number')
+                if not issue_number:
+                    continue
+                    
+                issue_id = f"issue#{org}/{repo}#{issue_number}"
+                labels = issue.get('labels') or []
+                label_names = [label.get('name') for label in labels]
                 
-            issue_number = issue.get('number')
-            if not issue_number:
-                continue
+                # Safely get user info
+                user_data = issue.get('user')
+                if not user_data:
+                    continue
                 
-            issue_id = f"issue#{org}/{repo}#{issue_number}"
-            
-            # Safely get user info
-            user_data = issue.get('user')
-            if not user_data:
-                continue
-            
-            user_login = user_data.get('login')
-            if not user_login:
-                continue
+                user_login = user_data.get('login')
+                if not user_login:
+                    continue
+                    
+                user_id = f"user#{user_login}"
                 
-            user_id = f"user#{user_login}"
-            
-            # Create issue node
-            upsert_node(
-                issue_id,
-                'issue',
-                {
-                    'number': issue_number,
-                    'title': issue.get('title'),
-                    'body': issue.get('body', '')[:500],
-                    'state': issue.get('state'),
-                    'labels': [label.get('name') for label in issue.get('labels', [])],
-                    'createdAt': issue.get('created_at'),
-                    'url': issue.get('html_url'),
-                    'comments': issue.get('comments', 0)
-                }
-            )
-            
-            # Create user node
-            if user_login:
+                # Create issue node
                 upsert_node(
-                    user_id,
-                    'user',
-                    {
-                        'login': user_login,
-                        'url': user_data.get('html_url'),
-                        'avatarUrl': user_data.get('avatar_url'),
-                        'type': 'contributor'
-                    }
+                    issue_id,
+                    'issue',
+                    issue_node_data(issue, label_names,
+                                    label_mask(label_names, label_index) if label_index is not None else None),
+                    writer=nw,
+                    updated_at=now_iso
                 )
                 
-                # Create AUTHORED edge
-                upsert_edge(user_id, issue_id, 'AUTHORED', {'createdAt': issue.get('created_at')})
-            
-            # Create IN_REPO edge
-            upsert_edge(issue_id, repo_id, 'IN_REPO')
-            
-            # Create HAS_LABEL edges
-            for label in issue.get('labels', []):
-                label_name = label.get('name')
-                label_id = f"label#{org}/{repo}#{label_name}"
-                upsert_node(label_id, 'label', {'name': label_name, 'color': label.get('color')})
-                upsert_edge(issue_id, label_id, 'HAS_LABEL')
-            
-            stats['issues'] += 1
-            save_to_s3(issue, f"github/{org}/{repo}/issues/{date_path}/issue-{issue_number}.json")
+                # Create user node
+                if user_login:
+                    upsert_node(
+                        user_id,
+                        'user',
+                        user_node_data(user_data),
+                        writer=nw,
+                        updated_at=now_iso
+                    )
+                    
+                    # Create AUTHORED edge
+                    upsert_edge(user_id, issue_id, 'AUTHORED', {'createdAt': issue.get('created_at')},
+                                user_edge_attributes(user_data), writer=ew, updated_at=now_iso)
+                
+                # Create IN_REPO edge
+                upsert_edge(issue_id, repo_id, 'IN_REPO', writer=ew, updated_at=now_iso)
+                
+                # Create HAS_LABEL edges
+                for label, label_name in zip(labels, label_names):
+                    label_id = f"label#{org}/{repo}#{label_name}"
+                    upsert_node(label_id, 'label', label_node_data(label_name, label.get('color')), writer=nw, updated_at=now_iso)
+                    upsert_edge(issue_id, label_id, 'HAS_LABEL', writer=ew, updated_at=now_iso)
+                
+                stats['issues'] += 1
+                raw_issues.append(issue)
+        
+        unprocessed = len(nw.unprocessed) + len(ew.unprocessed)
+        if unprocessed:
+            stats['errors'].append(f"{unprocessed} issue graph writes left unprocessed")
+        
+        if raw_issues:
+            save_to_s3(raw_issues, f"github/{org}/{repo}/issues/{date_path}/issues.jsonl.gz", jsonl=True)
     
-    print(f"Ingestion complete for {org}/{repo}:")
-    print(f"  - {stats['contributors']}/{stats['contributors_total']} contributors processed ({stats['bots_skipped']} bots skipped)")
-    print(f"  - {stats['prs']} pull requests")
-    print(f"  - {stats['issues']} issues")
-    print(f"  - {stats['files']} files")
+    logger.info("Ingestion complete for %s/%s:", org, repo)
+    logger.info("  - %s/%s contributors processed (%s bots skipped)", stats['contributors'], stats['contributors_total'], stats['bots_skipped'])
+    logger.info("  - %s pull requests", stats['prs'])
+    logger.info("  - %s issues", stats['issues'])
+    logger.info("  - %s files", stats['files'])
     
     return stats
 
 
+def get_enabled_repos() -> List[Dict]:
+    """
+    Enabled repos (org, repo, ingestCursor only), cached for
+    ENABLED_REPOS_TTL_SECONDS so back-to-back warm invocations skip the scan
+    """
+    if enabled_repos_cache['repos'] is not None and time.time() < enabled_repos_cache['expires']:
+        return enabled_repos_cache['repos']
+    
+    scan_kwargs = {
+        'FilterExpression': 'enabled = :enabled',
+        'ProjectionExpression': '#org, #repo, ingestCursor',
+        'ExpressionAttributeNames': {'#org': 'org', '#repo': 'repo'},
+        'ExpressionAttributeValues': {':enabled': True}
+    }
+    repos = []
+    while True:
+        response = get_repos_table().scan(**scan_kwargs)
+        repos.extend(response.get('Items', []))
+        if 'LastEvaluatedKey' not in response:
+            break
+        scan_kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+    
+    # An empty result triggers the default-repo bootstrap, so don't cache it
+    if repos:
+        enabled_repos_cache['repos'] = repos
+        enabled_repos_cache['expires'] = time.time() + ENABLED_REPOS_TTL_SECONDS
+    return repos
+
+
+def ingest_repo_config(repo_config: Dict, token: str, mode: str) -> Dict:
+    """Ingest one enabled repo and record the outcome on its repos table item"""
+    org = repo_config.get('org')
+    repo = repo_config.get('repo')
+    cursor = repo_config.get('ingestCursor', '2024-01-01T00:00:00Z')
+    
+    try:
+        stats = ingest_repository(org, repo, token, cursor, mode)
+        
+        # Update cursor
+        try:
+            get_repos_table().update_item(
+                Key={'org': org, 'repo': repo},
+                UpdateExpression='SET lastIngestAt = :now, ingestStatus = :status',
+                ExpressionAttributeValues={
+                    ':now': datetime.now(timezone.utc).isoformat(),
+                    ':status': 'success'
+                }
+            )
+        except Exception as update_error:
+            logger.error("Error updating repo status: %s", update_error)
+        
+        return {
+            'repo': f"{org}/{repo}",
+            'status': 'success',
+            'stats': stats
+        }
+    except Exception as e:
+        logger.error("Error ingesting %s/%s: %s", org, repo, e)
+        # Try to update status to error
+        try:
+            get_repos_table().update_item(
+                Key={'org': org, 'repo': repo},
+                UpdateExpression='SET lastIngestAt = :now, ingestStatus = :status, lastError = :error',
+                ExpressionAttributeValues={
+                    ':now': datetime.now(timezone.utc).isoformat(),
+                    ':status': 'error',
+                    ':error': str(e)
+                }
+            )
+        except Exception as update_error:
+            logger.error("Error updating repo error status: %s", update_error)
+        
+        return {
+            'repo': f"{org}/{repo}",
+            'status': 'error',
+            'error': str(e)
+        }
+
+
 def lambda_handler(event, context):
     """Main Lambda handler"""
-    print(f"Starting ingestion: {json.dumps(event)}")
+    logger.info("Starting ingestion: %s", event)
     
     # Get ingestion mode from event
     mode = event.get('mode', 'contributors')  # Default to contributors only
-    print(f"Ingestion mode: {mode}")
+    logger.info("Ingestion mode: %s", mode)
     
     # Validate mode
     if mode not in ['contributors', 'prs', 'full']:
@@ -830,7 +1461,7 @@ def lambda_handler(event, context):
     # Get GitHub token
     token = get_github_token()
     if not token:
-        print("Warning: No GitHub token found, using environment variable")
+        logger.warning("Warning: No GitHub token found, using environment variable")
         token = os.environ.get('GITHUB_TOKEN', '')
         if not token:
             return {
@@ -838,28 +1469,30 @@ def lambda_handler(event, context):
                 'body': json.dumps({'error': 'GitHub token not configured'})
             }
     
+    configure_github_session(token)
+    
+    # Stable-node digests only cover writes made by this invocation
+    with warm_cache_lock:
+        written_node_digests.clear()
+    
     # Get enabled repositories
     try:
-        response = repos_table.scan(
-            FilterExpression='enabled = :enabled',
-            ExpressionAttributeValues={':enabled': True}
-        )
-        repos = response.get('Items', [])
+        repos = get_enabled_repos()
     except Exception as e:
-        print(f"Error fetching repos: {e}")
+        logger.error("Error fetching repos: %s", e)
         # If repos table is empty or doesn't exist, use default repo
         repos = [{
             'org': 'RooCodeInc',
             'repo': 'Roo-Code',
             'enabled': True
         }]
-        print("Using default repository: RooCodeInc/Roo-Code")
+        logger.info("Using default repository: RooCodeInc/Roo-Code")
     
     if not repos:
-        print("No enabled repositories found, adding default")
+        logger.info("No enabled repositories found, adding default")
         # Add default repository
         try:
-            repos_table.put_item(
+            get_repos_table().put_item(
                 Item={
                     'org': 'RooCodeInc',
                     'repo': 'Roo-Code',
@@ -874,61 +1507,21 @@ def lambda_handler(event, context):
             )
             repos = [{'org': 'RooCodeInc', 'repo': 'Roo-Code', 'enabled': True}]
         except Exception as e:
-            print(f"Error adding default repo: {e}")
+            logger.error("Error adding default repo: %s", e)
             return {
                 'statusCode': 200,
                 'body': json.dumps({'message': 'No repositories to ingest and could not add default'})
             }
     
-    # Ingest each repository
-    results = []
-    for repo_config in repos[:5]:  # Limit to 5 repos for hackathon
-        org = repo_config.get('org')
-        repo = repo_config.get('repo')
-        cursor = repo_config.get('ingestCursor', '2024-01-01T00:00:00Z')
-        
-        try:
-            stats = ingest_repository(org, repo, token, cursor, mode)
-            
-            # Update cursor
-            try:
-                repos_table.update_item(
-                    Key={'org': org, 'repo': repo},
-                    UpdateExpression='SET lastIngestAt = :now, ingestStatus = :status',
-                    ExpressionAttributeValues={
-                        ':now': datetime.now(timezone.utc).isoformat(),
-                        ':status': 'success'
-                    }
-                )
-            except Exception as update_error:
-                print(f"Error updating repo status: {update_error}")
-            
-            results.append({
-                'repo': f"{org}/{repo}",
-                'status': 'success',
-                'stats': stats
-            })
-        except Exception as e:
-            print(f"Error ingesting {org}/{repo}: {e}")
-            # Try to update status to error
-            try:
-                repos_table.update_item(
-                    Key={'org': org, 'repo': repo},
-                    UpdateExpression='SET lastIngestAt = :now, ingestStatus = :status, lastError = :error',
-                    ExpressionAttributeValues={
-                        ':now': datetime.now(timezone.utc).isoformat(),
-                        ':status': 'error',
-                        ':error': str(e)
-                    }
-                )
-            except Exception as update_error:
-                print(f"Error updating repo error status: {update_error}")
-            
-            results.append({
-                'repo': f"{org}/{repo}",
-                'status': 'error',
-                'error': str(e)
-            })
+    # Ingest repositories concurrently; each run is network-bound. The runs share
+    # the GitHub session, the ETag and rate-limit caches and the S3 upload queue,
+    # and use per-thread repos table resources
+    with ThreadPoolExecutor(max_workers=REPO_WORKERS) as executor:
+        results = list(executor.map(lambda repo_config: ingest_repo_config(repo_config, token, mode), repos[:5]))  # Limit to 5 repos for hackathon
+    
+    # Lambda freezes background threads once the handler returns, so wait for
+    # every repo's queued uploads here rather than per repo
+    flush_s3_uploads()
     
     return {
         'statusCode': 200,
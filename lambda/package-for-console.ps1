@@ -54,6 +54,11 @@ try {
     $zipPath = "../../$zipFile"
     Compress-Archive -Path * -DestinationPath $zipPath -Force
     
+    # The ingest function imports the shared node/edge item builders
+    if ($LambdaName -eq "ingest") {
+        Compress-Archive -Path ../common/graph_items.py -DestinationPath $zipPath -Update
+    }
+    
     Pop-Location
     
     # Get file size
@@ -19,6 +19,7 @@ pip install requests boto3 -t $TempDir --quiet
 
 # Copy Lambda function
 Copy-Item lambda/ingest/lambda_function.py $TempDir/
+Copy-Item lambda/common/graph_items.py $TempDir/
 
 # Create ZIP
 $ZipFile = "lambda/ingest/function.zip"
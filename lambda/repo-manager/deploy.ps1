@@ -35,7 +35,7 @@ New-Item -ItemType Directory -Path $TempDir -Force | Out-Null
 
 # Install dependencies
 Write-Host "Installing dependencies..."
-pip install requests boto3 -t $TempDir --quiet
+pip install requests boto3 orjson -t $TempDir --platform manylinux2014_x86_64 --python-version 3.13 --implementation cp --only-binary=:all: --quiet
 
 # Copy Lambda function
 Copy-Item lambda/repo-manager/lambda_function.py $TempDir/
@@ -3,22 +3,60 @@ ContribConnect Repository Manager Lambda Function
 Manages repository configurations in DynamoDB
 """
 
+import base64
 import json
+import logging
 import os
+import time
+from functools import partial
 import boto3
-from datetime import datetime
+from botocore.config import Config
+from botocore.exceptions import ClientError
 from decimal import Decimal
 
+try:
+    import orjson
+except ImportError:  # fall back to stdlib json if the wheel isn't packaged
+    orjson = None
 
-class DecimalEncoder(json.JSONEncoder):
-    """Custom JSON encoder to handle Decimal types from DynamoDB"""
-    def default(self, obj):
-        if isinstance(obj, Decimal):
-            return int(obj) if obj % 1 == 0 else float(obj)
-        return super(DecimalEncoder, self).default(obj)
+
+def decimal_default(obj):
+    """JSON default hook for the Decimal values DynamoDB returns"""
+    if isinstance(obj, Decimal):
+        return int(obj) if obj % 1 == 0 else float(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def loads_body(body: str):
+    """Parse a request body, preferring orjson's C decoder"""
+    if orjson is not None:
+        return orjson.loads(body)
+    return json.loads(body)
+
+
+def dumps_body(data) -> str:
+    """Serialize a response body, preferring orjson's C encoder"""
+    if orjson is not None:
+        return orjson.dumps(data, default=decimal_default).decode('utf-8')
+    return json.dumps(data, default=decimal_default)
+
+# Keep pooled connections alive across warm invocations; short timeouts so a
+# stalled socket fails fast instead of holding the invocation open
+boto_config = Config(
+    tcp_keepalive=True,
+    max_pool_connections=50,
+    connect_timeout=2,
+    read_timeout=3,
+    retries={'mode': 'adaptive', 'max_attempts': 3}
+)
+
+# Lambda's root logger; LOG_LEVEL=DEBUG also logs full incoming events
+logger = logging.getLogger()
+LOG_LEVEL = logging.getLevelName(os.environ.get('LOG_LEVEL', 'INFO').upper())
+logger.setLevel(LOG_LEVEL if isinstance(LOG_LEVEL, int) else logging.INFO)
 
 # Initialize AWS clients
-dynamodb = boto3.resource('dynamodb')
+dynamodb = boto3.resource('dynamodb', config=boto_config)
 
 # Environment variables
 REPOS_TABLE = os.environ.get('REPOS_TABLE', 'cc-repos-dev')
@@ -26,13 +64,61 @@ REPOS_TABLE = os.environ.get('REPOS_TABLE', 'cc-repos-dev')
 # DynamoDB table
 repos_table = dynamodb.Table(REPOS_TABLE)
 
+# Request bodies are small JSON commands; larger ones are rejected unparsed
+MAX_BODY_SIZE = 64 * 1024
 
-def add_repository(owner: str, repo: str, enabled: bool = True) -> dict:
-    """Add a repository to the configuration"""
-    
-    # Prepare item with basic data
-    now = datetime.utcnow().isoformat() + 'Z'
-    item = {
+# Response headers and canned error responses, built once per container
+CORS_HEADERS = {
+    'Content-Type': 'application/json',
+    'Access-Control-Allow-Origin': '*'
+}
+MISSING_OWNER_REPO_RESPONSE = {
+    'statusCode': 400,
+    'headers': CORS_HEADERS,
+    'body': json.dumps({'success': False, 'error': 'owner and repo are required'})
+}
+INVALID_UPDATES_RESPONSE = {
+    'statusCode': 400,
+    'headers': CORS_HEADERS,
+    'body': json.dumps({'success': False, 'error': 'updates must be a non-empty object'})
+}
+INVALID_BULK_RESPONSE = {
+    'statusCode': 400,
+    'headers': CORS_HEADERS,
+    'body': json.dumps({'success': False, 'error': 'repositories must be a non-empty list'})
+}
+BODY_TOO_LARGE_RESPONSE = {
+    'statusCode': 413,
+    'headers': CORS_HEADERS,
+    'body': json.dumps({'success': False, 'error': 'Request body too large'})
+}
+
+# list_repositories results per enabledOnly flag, reused by warm invocations
+# until they expire or an add/remove changes the table
+LIST_CACHE_TTL_SECONDS = int(os.environ.get('LIST_CACHE_TTL_SECONDS', '30'))
+list_cache = {}
+
+# Attributes the update action may change; keys and ingest state stay
+# owned by add and the ingest Lambda
+UPDATABLE_FIELDS = frozenset(['enabled', 'topics', 'description', 'stars', 'language', 'defaultBranch'])
+
+# Page size bounds for cursor-paginated list requests
+DEFAULT_LIST_LIMIT = 100
+MAX_LIST_LIMIT = 1000
+
+# BatchGetItem accepts at most 100 keys per request
+BATCH_GET_SIZE = 100
+
+
+def iso_utc_now() -> str:
+    """Current UTC time as an ISO-8601 string with a Z suffix (second precision)"""
+    return time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime())
+
+
+def build_repository_item(owner: str, repo: str, enabled: bool = True, now: str = None) -> dict:
+    """Repos table item for a newly added repository"""
+    now = now or iso_utc_now()
+    return {
         'org': owner,
         'repo': repo,
         'enabled': enabled,
@@ -47,16 +133,39 @@ def add_repository(owner: str, repo: str, enabled: bool = True) -> dict:
         'createdAt': now,
         'updatedAt': now
     }
+
+
+def add_repository(owner: str, repo: str, enabled: bool = True, now: str = None) -> dict:
+    """Add a repository to the configuration"""
     
-    # Store in DynamoDB
+    # Prepare item with basic data
+    item = build_repository_item(owner, repo, enabled, now)
+    
+    # Store in DynamoDB; the condition keeps an existing repo's metadata and
+    # ingest state from being overwritten by a repeated add
     try:
-        repos_table.put_item(Item=item)
+        repos_table.put_item(
+            Item=item,
+            ConditionExpression='attribute_not_exists(org) AND attribute_not_exists(repo)'
+        )
+        list_cache.clear()
         return {
             'success': True,
             'repository': f'{owner}/{repo}',
             'enabled': enabled,
             'message': 'Repository added successfully'
         }
+    except ClientError as e:
+        if e.response['Error']['Code'] == 'ConditionalCheckFailedException':
+            return {
+                'success': False,
+                'repository': f'{owner}/{repo}',
+                'error': 'Repository already exists'
+            }
+        return {
+            'success': False,
+            'error': f'Failed to store repository: {str(e)}'
+        }
     except Exception as e:
         return {
             'success': False,
@@ -64,38 +173,175 @@ def add_repository(owner: str, repo: str, enabled: bool = True) -> dict:
         }
 
 
-def list_repositories(enabled_only: bool = False) -> dict:
-    """List all repositories"""
+def build_scan_kwargs(enabled_only: bool = False) -> dict:
+    """Scan arguments shared by the full and paginated listings"""
+    scan_kwargs = {}
+    if enabled_only:
+        scan_kwargs['FilterExpression'] = 'enabled = :enabled'
+        scan_kwargs['ExpressionAttributeValues'] = {':enabled': True}
+    return scan_kwargs
+
+
+def encode_cursor(last_key: dict) -> str:
+    """Opaque cursor for a scan's LastEvaluatedKey"""
+    return base64.urlsafe_b64encode(json.dumps(last_key, default=decimal_default).encode('utf-8')).decode('ascii')
+
+
+def decode_cursor(cursor: str) -> dict:
+    """ExclusiveStartKey from a cursor produced by encode_cursor"""
+    key = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+    if not isinstance(key, dict):
+        raise ValueError('cursor does not encode a key')
+    return key
+
+
+def scan_repositories(enabled_only: bool = False) -> list:
+    """Scan the repos table, following LastEvaluatedKey past the 1MB page limit"""
+    scan_kwargs = build_scan_kwargs(enabled_only)
+    
+    items = []
+    while True:
+        response = repos_table.scan(**scan_kwargs)
+        items.extend(response.get('Items', []))
+        if 'LastEvaluatedKey' not in response:
+            return items
+        scan_kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+
+def existing_repository_keys(keys: list) -> set:
+    """(org, repo) pairs among keys that are already in the repos table"""
+    existing = set()
+    for start in range(0, len(keys), BATCH_GET_SIZE):
+        request = {REPOS_TABLE: {
+            'Keys': [{'org': owner, 'repo': repo} for owner, repo in keys[start:start + BATCH_GET_SIZE]],
+            'ProjectionExpression': '#org, #repo',
+            'ExpressionAttributeNames': {'#org': 'org', '#repo': 'repo'}
+        }}
+        attempt = 0
+        while request:
+            if attempt:
+                time.sleep(min(0.05 * (2 ** attempt), 5))
+            response = dynamodb.batch_get_item(RequestItems=request)
+            existing.update((item['org'], item['repo']) for item in response['Responses'].get(REPOS_TABLE, []))
+            request = response.get('UnprocessedKeys')
+            attempt += 1
+    return existing
+
+
+def add_repositories_bulk(repositories: list, now: str = None) -> dict:
+    """
+    Add many repositories at once; batch_writer sends them 25 per BatchWriteItem.
+    Like add, repositories that already exist are left untouched and reported.
+    """
+    now = now or iso_utc_now()
+    added = []
+    existing = []
+    invalid = []
     try:
-        if enabled_only:
-            response = repos_table.scan(
-                FilterExpression='enabled = :enabled',
-                ExpressionAttributeValues={':enabled': True}
-            )
-        else:
-            response = repos_table.scan()
+        # Valid, de-duplicated keys in request order
+        keys = {}
+        for entry in repositories:
+            owner = entry.get('owner', '') if isinstance(entry, dict) else ''
+            repo = entry.get('repo', '') if isinstance(entry, dict) else ''
+            if not owner or not repo:
+                invalid.append(entry)
+                continue
+            keys.setdefault((owner, repo), entry.get('enabled', True))
         
-        items = response.get('Items', [])
+        stored = existing_repository_keys(list(keys))
+        with repos_table.batch_writer() as batch:
+            for (owner, repo), enabled in keys.items():
+                if (owner, repo) in stored:
+                    existing.append(f'{owner}/{repo}')
+                    continue
+                batch.put_item(Item=build_repository_item(owner, repo, enabled, now))
+                added.append(f'{owner}/{repo}')
+        if added:
+            list_cache.clear()
+        return {
+            'success': True,
+            'count': len(added),
+            'repositories': added,
+            'existing': existing,
+            'invalid': invalid,
+            'message': f'{len(added)} repositories added, {len(existing)} already existed'
+        }
+    except Exception as e:
+        return {
+            'success': False,
+            'error': f'Failed to store repositories: {str(e)}'
+        }
+
+
+def scan_repositories_page(enabled_only: bool, limit: int, cursor: str = None) -> tuple:
+    """Scan a single page of at most limit items; returns (items, next cursor or None)"""
+    scan_kwargs = build_scan_kwargs(enabled_only)
+    scan_kwargs['Limit'] = limit
+    if cursor:
+        scan_kwargs['ExclusiveStartKey'] = decode_cursor(cursor)
+    
+    response = repos_table.scan(**scan_kwargs)
+    last_key = response.get('LastEvaluatedKey')
+    return response.get('Items', []), encode_cursor(last_key) if last_key else None
+
+
+def list_repositories(enabled_only: bool = False, limit: int = None, cursor: str = None) -> dict:
+    """List repositories; a limit or cursor returns one page plus the cursor for the next"""
+    paginated = limit is not None or cursor is not None
+    if paginated:
+        try:
+            limit = min(max(int(limit or DEFAULT_LIST_LIMIT), 1), MAX_LIST_LIMIT)
+        except (ValueError, TypeError):
+            return {
+                'success': False,
+                'error': 'limit must be an integer'
+            }
+    
+    # Only the full listing and first pages are cached; later pages are keyed
+    # by client-supplied cursors and would grow the cache without bound
+    cache_key = (enabled_only, limit) if paginated else enabled_only
+    cacheable = not cursor
+    cached = list_cache.get(cache_key) if cacheable else None
+    if cached and time.monotonic() < cached[0]:
+        return cached[1]
+    
+    try:
+        if paginated:
+            try:
+                items, next_cursor = scan_repositories_page(enabled_only, limit, cursor)
+            except ValueError as e:
+                return {
+                    'success': False,
+                    'error': f'Invalid cursor: {str(e)}'
+                }
+        else:
+            items = scan_repositories(enabled_only)
         
-        # Format response and handle Decimal types
-        repositories = []
-        for item in items:
-            repositories.append({
+        # Format response; Decimal values are converted by dumps_body
+        repositories = [
+            {
                 'repository': f"{item['org']}/{item['repo']}",
                 'enabled': bool(item.get('enabled', False)),
-                'stars': int(item.get('stars', 0)) if isinstance(item.get('stars'), Decimal) else item.get('stars', 0),
+                'stars': item.get('stars', 0),
                 'language': str(item.get('language', '')),
                 'topics': list(item.get('topics', [])),
                 'description': str(item.get('description', '')),
                 'ingestStatus': str(item.get('ingestStatus', 'unknown')),
                 'lastIngestAt': str(item.get('lastIngestAt', ''))
-            })
+            }
+            for item in items
+        ]
         
-        return {
+        result = {
             'success': True,
             'count': len(repositories),
             'repositories': repositories
         }
+        if paginated:
+            result['cursor'] = next_cursor
+        if cacheable:
+            list_cache[cache_key] = (time.monotonic() + LIST_CACHE_TTL_SECONDS, result)
+        return result
     except Exception as e:
         return {
             'success': False,
@@ -103,6 +349,80 @@ def list_repositories(enabled_only: bool = False) -> dict:
         }
 
 
+def update_repository(owner: str, repo: str, updates: dict, now: str = None) -> dict:
+    """Change several attributes of an existing repository in one SET-only update_item"""
+    unknown = sorted(set(updates) - UPDATABLE_FIELDS)
+    if unknown:
+        return {
+            'success': False,
+            'error': f"Fields cannot be updated: {', '.join(unknown)}",
+            'updatableFields': sorted(UPDATABLE_FIELDS)
+        }
+    
+    values = dict(updates, updatedAt=now or iso_utc_now())
+    try:
+        repos_table.update_item(
+            Key={
+                'org': owner,
+                'repo': repo
+            },
+            UpdateExpression='SET ' + ', '.join(f'#{k} = :{k}' for k in values),
+            ExpressionAttributeNames={f'#{k}': k for k in values},
+            ExpressionAttributeValues={f':{k}': v for k, v in values.items()},
+            ConditionExpression='attribute_exists(org) AND attribute_exists(repo)',
+            ReturnValues='NONE'
+        )
+        list_cache.clear()
+        return {
+            'success': True,
+            'repository': f'{owner}/{repo}',
+            'updated': sorted(updates),
+            'message': 'Repository updated'
+        }
+    except ClientError as e:
+        if e.response['Error']['Code'] == 'ConditionalCheckFailedException':
+            return {
+                'success': False,
+                'repository': f'{owner}/{repo}',
+                'error': 'Repository not found'
+            }
+        return {
+            'success': False,
+            'error': f'Failed to update repository: {str(e)}'
+        }
+    except Exception as e:
+        return {
+            'success': False,
+            'error': f'Failed to update repository: {str(e)}'
+        }
+
+
+def get_repository(owner: str, repo: str) -> dict:
+    """Fetch a single repository's full configuration"""
+    try:
+        response = repos_table.get_item(
+            Key={
+                'org': owner,
+                'repo': repo
+            }
+        )
+        if 'Item' not in response:
+            return {
+                'success': False,
+                'repository': f'{owner}/{repo}',
+                'error': 'Repository not found'
+            }
+        return {
+            'success': True,
+            'repository': response['Item']
+        }
+    except Exception as e:
+        return {
+            'success': False,
+            'error': f'Failed to get repository: {str(e)}'
+        }
+
+
 def remove_repository(owner: str, repo: str) -> dict:
     """Remove a repository from the configuration"""
     try:
@@ -112,6 +432,7 @@ def remove_repository(owner: str, repo: str) -> dict:
                 'repo': repo
             }
         )
+        list_cache.clear()
         return {
             'success': True,
             'repository': f'{owner}/{repo}',
@@ -124,90 +445,124 @@ def remove_repository(owner: str, repo: str) -> dict:
         }
 
 
+def respond(result: dict) -> dict:
+    """API response for an action result; 200 on success, 400 otherwise"""
+    return {
+        'statusCode': 200 if result.get('success') else 400,
+        'headers': CORS_HEADERS,
+        'body': dumps_body(result)
+    }
+
+
+def owner_and_repo(body: dict):
+    """(owner, repo) from a request body, or None if either is missing"""
+    owner, repo = body.get('owner', ''), body.get('repo', '')
+    return (owner, repo) if owner and repo else None
+
+
+def handle_add(body: dict, now: str) -> dict:
+    """Add one repository"""
+    key = owner_and_repo(body)
+    if not key:
+        return MISSING_OWNER_REPO_RESPONSE
+    return respond(add_repository(*key, body.get('enabled', True), now))
+
+
+def handle_add_bulk(body: dict, now: str) -> dict:
+    """Add a list of repositories"""
+    repositories = body.get('repositories')
+    if not isinstance(repositories, list) or not repositories:
+        return INVALID_BULK_RESPONSE
+    return respond(add_repositories_bulk(repositories, now))
+
+
+def handle_list(body: dict, now: str) -> dict:
+    """List repositories, optionally one page at a time"""
+    return respond(list_repositories(body.get('enabledOnly', False), body.get('limit'), body.get('cursor')))
+
+
+def handle_get(body: dict, now: str) -> dict:
+    """Get one repository"""
+    key = owner_and_repo(body)
+    if not key:
+        return MISSING_OWNER_REPO_RESPONSE
+    return respond(get_repository(*key))
+
+
+def handle_remove(body: dict, now: str) -> dict:
+    """Remove one repository"""
+    key = owner_and_repo(body)
+    if not key:
+        return MISSING_OWNER_REPO_RESPONSE
+    return respond(remove_repository(*key))
+
+
+def handle_update(body: dict, now: str) -> dict:
+    """Update attributes of one repository"""
+    key = owner_and_repo(body)
+    if not key:
+        return MISSING_OWNER_REPO_RESPONSE
+    updates = body.get('updates')
+    if not isinstance(updates, dict) or not updates:
+        return INVALID_UPDATES_RESPONSE
+    return respond(update_repository(*key, updates, now))
+
+
+def handle_set_enabled(enabled: bool, body: dict, now: str) -> dict:
+    """Enable or disable one repository"""
+    key = owner_and_repo(body)
+    if not key:
+        return MISSING_OWNER_REPO_RESPONSE
+    return respond(update_repository(*key, {'enabled': enabled}, now))
+
+
+# Request action -> handler(body, now) returning the API response
+ACTIONS = {
+    'add': handle_add,
+    'addBulk': handle_add_bulk,
+    'list': handle_list,
+    'get': handle_get,
+    'remove': handle_remove,
+    'update': handle_update,
+    'enable': partial(handle_set_enabled, True),
+    'disable': partial(handle_set_enabled, False)
+}
+INVALID_ACTION_RESPONSE = {
+    'statusCode': 400,
+    'headers': CORS_HEADERS,
+    'body': json.dumps({'success': False, 'error': 'Invalid action', 'validActions': list(ACTIONS)})
+}
+
+
 def lambda_handler(event, context):
     """Main Lambda handler"""
-    print(f"Repository manager request: {json.dumps(event)}")
+    logger.debug("Repository manager request: %s", event)
     
     try:
         # Parse request - handle both API Gateway and direct invocation
         if 'body' in event:
             body = event.get('body', '{}')
             if isinstance(body, str):
-                body = json.loads(body)
+                if len(body) > MAX_BODY_SIZE:
+                    return BODY_TOO_LARGE_RESPONSE
+                body = loads_body(body)
         else:
             body = event
         
         action = body.get('action')
-        owner = body.get('owner', '')
-        repo = body.get('repo', '')
-        
-        print(f"Action: {action}, Owner: {owner}, Repo: {repo}")
-        
-        if action == 'add':
-            if not owner or not repo:
-                return {
-                    'statusCode': 400,
-                    'headers': {
-                        'Content-Type': 'application/json',
-                        'Access-Control-Allow-Origin': '*'
-                    },
-                    'body': json.dumps({'success': False, 'error': 'owner and repo are required'})
-                }
-            
-            enabled = body.get('enabled', True)
-            result = add_repository(owner, repo, enabled)
-            
-        elif action == 'list':
-            enabled_only = body.get('enabledOnly', False)
-            result = list_repositories(enabled_only)
-            
-        elif action == 'remove':
-            if not owner or not repo:
-                return {
-                    'statusCode': 400,
-                    'headers': {
-                        'Content-Type': 'application/json',
-                        'Access-Control-Allow-Origin': '*'
-                    },
-                    'body': json.dumps({'success': False, 'error': 'owner and repo are required'})
-                }
-            
-            result = remove_repository(owner, repo)
-            
-        else:
-            return {
-                'statusCode': 400,
-                'headers': {
-                    'Content-Type': 'application/json',
-                    'Access-Control-Allow-Origin': '*'
-                },
-                'body': json.dumps({
-                    'success': False,
-                    'error': 'Invalid action',
-                    'validActions': ['add', 'list', 'remove']
-                })
-            }
+        logger.info("Action: %s, Owner: %s, Repo: %s", action, body.get('owner', ''), body.get('repo', ''))
         
-        status_code = 200 if result.get('success') else 400
+        handler = ACTIONS.get(action) if isinstance(action, str) else None
+        if handler is None:
+            return INVALID_ACTION_RESPONSE
         
-        return {
-            'statusCode': status_code,
-            'headers': {
-                'Content-Type': 'application/json',
-                'Access-Control-Allow-Origin': '*'
-            },
-            'body': json.dumps(result, cls=DecimalEncoder)
-        }
+        # One timestamp for every write made by this request
+        return handler(body, iso_utc_now())
         
     except Exception as e:
-        print(f"Error processing request: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Error processing request: %s", e)
         return {
             'statusCode': 500,
-            'headers': {
-                'Content-Type': 'application/json',
-                'Access-Control-Allow-Origin': '*'
-            },
-            'body': json.dumps({'success': False, 'error': f'Internal server error: {str(e)}'}, cls=DecimalEncoder)
-        }
\ No newline at end of file
+            'headers': CORS_HEADERS,
+            'body': dumps_body({'success': False, 'error': f'Internal server error: {str(e)}'})
+        }
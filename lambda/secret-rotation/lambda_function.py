@@ -4,29 +4,62 @@ Handles automatic rotation of GitHub tokens and API keys
 """
 
 import json
+import logging
 import os
 import boto3
+from botocore.config import Config
+from botocore.exceptions import ClientError
 import secrets as secrets_module
+from datetime import datetime, timezone
 from typing import Dict
 
+# Keep pooled connections alive across warm invocations; short timeouts so a
+# stalled socket fails fast instead of holding the invocation open
+boto_config = Config(
+    tcp_keepalive=True,
+    max_pool_connections=50,
+    connect_timeout=2,
+    read_timeout=3,
+    retries={'mode': 'adaptive', 'max_attempts': 3}
+)
+
+# Lambda's root logger; LOG_LEVEL=DEBUG also logs full incoming events
+logger = logging.getLogger()
+LOG_LEVEL = logging.getLevelName(os.environ.get('LOG_LEVEL', 'INFO').upper())
+logger.setLevel(LOG_LEVEL if isinstance(LOG_LEVEL, int) else logging.INFO)
+
 # Initialize AWS clients
-secrets_client = boto3.client('secretsmanager')
-ses_client = boto3.client('ses')
+secrets_client = boto3.client('secretsmanager', config=boto_config)
+ses_client = boto3.client('ses', config=boto_config)
 
 # Environment variables
 NOTIFICATION_EMAIL = os.environ.get('NOTIFICATION_EMAIL', '')
 
+# Secret name per ARN; a secret's name can't change, so warm invocations
+# for later rotation steps skip describe_secret
+secret_names = {}
+
+# AWSCURRENT version id per ARN as of this container's last finishSecret,
+# so a later rotation can move the stage without describe_secret
+current_versions = {}
+
 
 def generate_api_key() -> str:
     """Generate a new random API key"""
-    random_bytes = secrets_module.token_bytes(32)
     return "cc-" + secrets_module.token_hex(20)
 
 
+def get_secret_name(secret_arn: str) -> str:
+    """Look up (and remember) the name of the secret being rotated"""
+    if secret_arn not in secret_names:
+        secret_names[secret_arn] = secrets_client.describe_secret(SecretId=secret_arn)['Name']
+    return secret_names[secret_arn]
+
+
 def send_rotation_notification(secret_name: str, rotation_type: str, new_value: str = None):
     """Send email notification about secret rotation"""
     if not NOTIFICATION_EMAIL:
-        print("No notification email configured, skipping notification")
+        logger.info("No notification email configured, skipping notification")
         return
     
     subject = f"[ContribConnect] Secret Rotation: {secret_name}"
@@ -71,36 +104,48 @@ The current token will expire soon.
                 'Body': {'Text': {'Data': body}}
             }
         )
-        print(f"Notification sent to {NOTIFICATION_EMAIL}")
+        logger.info("Notification sent to %s", NOTIFICATION_EMAIL)
     except Exception as e:
-        print(f"Failed to send notification: {e}")
+        logger.error("Failed to send notification: %s", e)
 
 
-def create_secret(secret_arn: str, token: str) -> Dict:
+def create_secret(secret_arn: str, token: str, context=None) -> Dict:
     """
     Create a new version of the secret
     
     This is called during the createSecret step of rotation
     """
-    print(f"Creating new secret version for {secret_arn}")
+    logger.info("Creating new secret version for %s", secret_arn)
     
-    # Get current secret metadata
-    metadata = secrets_client.describe_secret(SecretId=secret_arn)
-    secret_name = metadata['Name']
+    # Get the secret name (cached per ARN)
+    secret_name = get_secret_name(secret_arn)
     
     # Determine secret type
     if 'api-key' in secret_name:
+        # A retried createSecret finds its pending version already stored;
+        # putting a fresh key under the same token would fail
+        try:
+            secrets_client.get_secret_value(SecretId=secret_arn, VersionId=token, VersionStage='AWSPENDING')
+            logger.info("Version %s is already AWSPENDING", token)
+            return {'status': 'success', 'message': 'New API key already generated'}
+        except secrets_client.exceptions.ResourceNotFoundException:
+            pass
+        
         # Generate new API key
         new_api_key = generate_api_key()
         new_secret = json.dumps({
             'key': new_api_key,
             'environment': os.environ.get('ENVIRONMENT', 'dev'),
-            'rotatedAt': boto3.client('sts').get_caller_identity()['Account']
+            'rotatedAt': datetime.now(timezone.utc).isoformat(),
+            # Account id from this function's ARN (arn:aws:lambda:region:account:function:name)
+            'rotatedBy': context.invoked_function_arn.split(':')[4] if context else ''
         })
         
-        # Store new version with AWSPENDING label
+        # Store new version with AWSPENDING label; the rotation token becomes
+        # its version id, which finishSecret relies on
         secrets_client.put_secret_value(
             SecretId=secret_arn,
+            ClientRequestToken=token,
             SecretString=new_secret,
             VersionStages=['AWSPENDING']
         )
@@ -127,7 +172,7 @@ def set_secret(secret_arn: str, token: str) -> Dict:
     
     This is called during the setSecret step of rotation
     """
-    print(f"Testing new secret version for {secret_arn}")
+    logger.info("Testing new secret version for %s", secret_arn)
     
     # Get the AWSPENDING version
     response = secrets_client.get_secret_value(
@@ -156,7 +201,7 @@ def test_secret(secret_arn: str, token: str) -> Dict:
     
     This is called during the testSecret step of rotation
     """
-    print(f"Testing new secret in application for {secret_arn}")
+    logger.info("Testing new secret in application for %s", secret_arn)
     
     # In a real implementation, you would:
     # 1. Get the AWSPENDING version
@@ -171,35 +216,47 @@ def finish_secret(secret_arn: str, token: str) -> Dict:
     """
     Finalize the rotation by moving AWSCURRENT to the new version
     
-    This is called during the finishSecret step of rotation
+    This is called during the finishSecret step of rotation. The rotation
+    token is the AWSPENDING version's id; describe_secret is only needed
+    when the current version isn't cached or the cached one is stale.
     """
-    print(f"Finalizing rotation for {secret_arn}")
+    logger.info("Finalizing rotation for %s", secret_arn)
     
-    # Get current version
-    metadata = secrets_client.describe_secret(SecretId=secret_arn)
-    current_version = None
-    pending_version = None
+    current_version = current_versions.get(secret_arn)
+    if current_version and current_version != token:
+        try:
+            promote_version(secret_arn, token, current_version)
+            return {'status': 'success', 'message': 'Rotation completed successfully'}
+        except ClientError as e:
+            logger.warning("Cached current version for %s is stale, re-reading: %s", secret_arn, e)
     
-    for version_id, stages in metadata['VersionIdsToStages'].items():
-        if 'AWSCURRENT' in stages:
-            current_version = version_id
-        if 'AWSPENDING' in stages:
-            pending_version = version_id
+    # Read the version stages from the secret's metadata
+    versions = secrets_client.describe_secret(SecretId=secret_arn)['VersionIdsToStages']
+    if token not in versions:
+        return {'status': 'error', 'message': f'No version {token} found'}
     
-    if not pending_version:
-        return {'status': 'error', 'message': 'No AWSPENDING version found'}
+    current_version = next((version_id for version_id, stages in versions.items() if 'AWSCURRENT' in stages), None)
+    if current_version == token:
+        # A retried finishSecret; the stage has already moved
+        current_versions[secret_arn] = token
+        logger.info("Version %s is already AWSCURRENT", token)
+        return {'status': 'success', 'message': 'Rotation already completed'}
     
-    # Move AWSCURRENT to the new version
+    promote_version(secret_arn, token, current_version)
+    return {'status': 'success', 'message': 'Rotation completed successfully'}
+
+
+def promote_version(secret_arn: str, token: str, current_version: str):
+    """Move AWSCURRENT from current_version to the rotation token's version"""
     secrets_client.update_secret_version_stage(
         SecretId=secret_arn,
         VersionStage='AWSCURRENT',
-        MoveToVersionId=pending_version,
+        MoveToVersionId=token,
         RemoveFromVersionId=current_version
     )
+    current_versions[secret_arn] = token
     
-    print(f"Rotation complete. New version {pending_version} is now AWSCURRENT")
-    
-    return {'status': 'success', 'message': 'Rotation completed successfully'}
+    logger.info("Rotation complete. New version %s is now AWSCURRENT", token)
 
 
 def lambda_handler(event, context):
@@ -213,7 +270,7 @@ def lambda_handler(event, context):
         "Token": "rotation-token"
     }
     """
-    print(f"Rotation event: {json.dumps(event)}")
+    logger.debug("Rotation event: %s", event)
     
     secret_arn = event['SecretId']
     token = event['Token']
@@ -221,7 +278,7 @@ def lambda_handler(event, context):
     
     try:
         if step == 'createSecret':
-            result = create_secret(secret_arn, token)
+            result = create_secret(secret_arn, token, context)
         elif step == 'setSecret':
             result = set_secret(secret_arn, token)
         elif step == 'testSecret':
@@ -231,11 +288,11 @@ def lambda_handler(event, context):
         else:
             raise ValueError(f"Invalid step: {step}")
         
-        print(f"Step {step} completed: {result}")
+        logger.info("Step %s completed: %s", step, result)
         return result
         
     except Exception as e:
-        print(f"Error during rotation step {step}: {e}")
+        logger.exception("Error during rotation step %s: %s", step, e)
         raise
 
 
@@ -0,0 +1,55 @@
+"""
+ContribConnect edge bucket backfill
+One-off: sets toIdBucket on edges written before the ShardedReverseEdgeIndex
+existed, so the graph tool can read incoming edges from the shards alone
+"""
+
+import os
+import sys
+import boto3
+from concurrent.futures import ThreadPoolExecutor
+
+# Bucket assignment shared with the ingest Lambda and the scraper
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'lambda', 'common'))
+from graph_items import edge_bucket
+
+# Parallel scan segments, each scanned and updated by its own thread
+SCAN_SEGMENTS = 8
+
+
+def backfill_segment(table_name: str, segment: int) -> int:
+    """Set toIdBucket on every edge in one scan segment that lacks it; returns how many were updated"""
+    # boto3 resources aren't thread-safe, so each segment gets its own session
+    table = boto3.Session().resource('dynamodb').Table(table_name)
+    conditional_check_failed = table.meta.client.exceptions.ConditionalCheckFailedException
+    scan_kwargs = {
+        'Segment': segment,
+        'TotalSegments': SCAN_SEGMENTS,
+        'ProjectionExpression': 'fromId, toIdEdgeType, toId',
+        'FilterExpression': 'attribute_not_exists(toIdBucket)'
+    }
+    updated = 0
+    while True:
+        response = table.scan(**scan_kwargs)
+        for edge in response.get('Items', []):
+            try:
+                table.update_item(
+                    Key={'fromId': edge['fromId'], 'toIdEdgeType': edge['toIdEdgeType']},
+                    UpdateExpression='SET toIdBucket = :bucket',
+                    ConditionExpression='attribute_exists(fromId) AND attribute_not_exists(toIdBucket)',
+                    ExpressionAttributeValues={':bucket': f"{edge['toId']}#{edge_bucket(edge['fromId'])}"}
+                )
+                updated += 1
+            except conditional_check_failed:
+                pass  # deleted or re-ingested since the scan read it
+        if 'LastEvaluatedKey' not in response:
+            return updated
+        scan_kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+
+if __name__ == "__main__":
+    edges_table = os.environ.get('EDGES_TABLE', 'cc-edges-dev')
+    print(f"🪣 Backfilling toIdBucket on {edges_table} ({SCAN_SEGMENTS} segments)...")
+    with ThreadPoolExecutor(max_workers=SCAN_SEGMENTS) as executor:
+        counts = list(executor.map(lambda segment: backfill_segment(edges_table, segment), range(SCAN_SEGMENTS)))
+    print(f"✅ Updated {sum(counts)} edges")
@@ -3,14 +3,202 @@ ContribConnect Comprehensive GitHub Scraper
 Standalone script for deep data collection with all advanced features
 """
 
+import atexit
+import binascii
 import json
+import math
 import os
 import time
 import re
+import sys
 import boto3
-from typing import List, Dict, Optional, Tuple, Any
-from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import List, Dict, Optional, Tuple, Any, Callable
+from datetime import datetime, timedelta, timezone
+from urllib.parse import urlencode, urlparse, parse_qs
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    import orjson
+except ImportError:  # fall back to stdlib json if orjson isn't installed
+    orjson = None
+
+# Node/edge shapes shared with the ingest Lambda
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'lambda', 'common'))
+from graph_items import (
+    claim_label_bits, edge_item, file_node_data, issue_node_data, label_mask,
+    label_node_data, node_item, pr_node_data, user_edge_attributes, user_node_data
+)
+
+# Issue references in PR/commit bodies. Keyword links ("fixes #12") are a
+# subset of bare "#12" references, so one pattern finds both
+ISSUE_REF_PATTERN = re.compile(r'#(\d+)')
+
+
+@lru_cache(maxsize=4096)
+def linked_issue_numbers(text: str) -> Tuple[int, ...]:
+    """Sorted issue numbers referenced in text; memoized since many PR bodies share a template"""
+    return tuple(sorted({int(m) for m in ISSUE_REF_PATTERN.findall(text)}))
+
+
+def interned(value: Optional[str]) -> Optional[str]:
+    """
+    sys.intern a string that repeats across many records (logins, label
+    names, directories) so each distinct value is stored once
+    """
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+def utc_now_iso() -> str:
+    """Current UTC time in GitHub's timestamp format ("2025-10-19T02:00:00Z")"""
+    return datetime.now(timezone.utc).isoformat(timespec='seconds').replace('+00:00', 'Z')
+
+
+def github_timestamp(value: str) -> str:
+    """
+    Normalize an ISO-8601 time to GitHub's fixed-width UTC form
+    ("2025-10-19T02:00:00Z"), which sorts lexicographically, so cutoffs
+    can be compared against API timestamps as plain strings
+    """
+    dt = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.astimezone(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+
+
+def summarize_pr(pr_data: Dict) -> Optional[Dict]:
+    """Full-scrape record for a REST pull request, or None if it has no author"""
+    user_data = pr_data.get('user')
+    if not user_data:
+        return None
+    
+    body = pr_data.get("body")
+    return {
+        "number": pr_data.get("number"),
+        "title": pr_data.get("title"),
+        "body": body,
+        "state": pr_data.get("state"),
+        # The REST listing has no merged flag; merged_at is only set once merged
+        "merged": pr_data.get("merged_at") is not None,
+        "draft": pr_data.get("draft", False),
+        "author": interned(user_data.get("login")),
+        "author_url": user_data.get("html_url"),
+        "author_avatar_url": user_data.get("avatar_url"),
+        "linked_issues": list(linked_issue_numbers(body)) if body else [],
+        "created_at": pr_data.get("created_at"),
+        "updated_at": pr_data.get("updated_at"),
+        "closed_at": pr_data.get("closed_at"),
+        "merged_at": pr_data.get("merged_at"),
+        "html_url": pr_data.get("html_url"),
+        "base_branch": interned((pr_data.get("base") or {}).get("ref")),
+        "head_branch": (pr_data.get("head") or {}).get("ref"),
+    }
+
+
+def summarize_issue(issue_data: Dict) -> Optional[Dict]:
+    """Record for a REST issue, or None if it has no author"""
+    user_data = issue_data.get('user')
+    if not user_data:
+        return None
+    
+    labels = issue_data.get("labels", [])
+    return {
+        "number": issue_data.get("number"),
+        "title": issue_data.get("title"),
+        "body": issue_data.get("body"),
+        "state": issue_data.get("state"),
+        "created_at": issue_data.get("created_at"),
+        "updated_at": issue_data.get("updated_at"),
+        "author": interned(user_data.get("login")),
+        "author_url": user_data.get("html_url"),
+        "author_avatar_url": user_data.get("avatar_url"),
+        "labels": [interned(l.get("name")) for l in labels],
+        "label_colors": {interned(l.get("name")): l.get("color") for l in labels},
+        "comments": issue_data.get("comments", 0),
+        "html_url": issue_data.get("html_url"),
+    }
+
+
+# Pull request node fields only the per-PR endpoints return; REST listings
+# lack them, so those PR nodes are only created, never overwritten
+PR_DETAIL_FIELDS = ('additions', 'deletions', 'changed_files', 'commits')
+
+# On-disk cache of GitHub responses and their ETags; revalidating with
+# If-None-Match returns 304 (free against the rate limit) when unchanged
+ETAG_CACHE_FILE = os.environ.get('GH_ETAG_CACHE_FILE', '.gh_etag_cache.json')
+
+# Entries hold whole response bodies, so the file keeps only the most
+# recently used ones and drops any not used for a while
+ETAG_CACHE_MAX_ENTRIES = 2000
+ETAG_CACHE_MAX_AGE_SECONDS = 14 * 24 * 3600
+
+# Recently updated PRs with their changed files in one GraphQL page, instead
+# of a REST listing plus one /files request per PR
+UPDATED_PRS_QUERY = """
+query($owner: String!, $name: String!, $cursor: String, $includeFiles: Boolean!) {
+  repository(owner: $owner, name: $name) {
+    pullRequests(first: 100, after: $cursor, orderBy: {field: UPDATED_AT, direction: DESC}) {
+      nodes {
+        number
+        title
+        body
+        state
+        merged
+        isDraft
+        createdAt
+        updatedAt
+        closedAt
+        mergedAt
+        url
+        additions
+        deletions
+        changedFiles
+        commits { totalCount }
+        baseRefName
+        headRefName
+        author { login url avatarUrl }
+        files(first: 100) @include(if: $includeFiles) {
+          nodes { path additions deletions changeType }
+          pageInfo { hasNextPage }
+        }
+      }
+      pageInfo { endCursor hasNextPage }
+    }
+  }
+}
+"""
+
+# Special file locations, in priority order
+CODEOWNERS_PATHS = ["CODEOWNERS", ".github/CODEOWNERS", "docs/CODEOWNERS"]
+CONTRIBUTING_PATHS = ["CONTRIBUTING.md", ".github/CONTRIBUTING.md", "docs/CONTRIBUTING.md"]
+SPECIAL_FILE_PATHS = CODEOWNERS_PATHS + CONTRIBUTING_PATHS + ["package.json"]
+
+# Every special file location in one GraphQL query on the default branch;
+# missing paths come back null instead of costing a 404 round trip each
+SPECIAL_FILES_QUERY = """
+query($owner: String!, $name: String!) {
+  repository(owner: $owner, name: $name) {
+%s
+  }
+}
+""" % "\n".join(
+    f'    file{index}: object(expression: "HEAD:{path}") {{ ... on Blob {{ text }} }}'
+    for index, path in enumerate(SPECIAL_FILE_PATHS)
+)
+
+# GraphQL PatchStatus -> REST file status
+CHANGE_TYPE_STATUS = {
+    'ADDED': 'added',
+    'MODIFIED': 'modified',
+    'DELETED': 'removed',
+    'RENAMED': 'renamed',
+    'COPIED': 'copied',
+    'CHANGED': 'changed',
+}
+
 
 class ComprehensiveGitHubScraper:
     """
@@ -27,56 +215,218 @@ class ComprehensiveGitHubScraper:
         """Initialize scraper with GitHub token"""
         self.token = github_token or os.environ.get('GITHUB_TOKEN', '')
         self.base_url = "https://api.github.com"
+        self.graphql_url = "https://api.github.com/graphql"
         self.headers = {
             'Authorization': f'token {self.token}',
             'Accept': 'application/vnd.github.v3+json'
         }
         
+        # One pooled session for every request, so connections (and their TLS
+        # handshakes) are reused; transient 5xx/429 responses are retried with backoff
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        adapter = HTTPAdapter(
+            pool_connections=16,
+            pool_maxsize=64,
+            max_retries=Retry(
+                total=5,
+                backoff_factor=0.5,
+                status_forcelist=[429, 502, 503, 504],
+                allowed_methods=['GET', 'POST']  # POST is only used for read-only GraphQL queries
+            )
+        )
+        self.session.mount('https://', adapter)
+        
         # AWS clients for DynamoDB integration
         self.dynamodb = boto3.resource('dynamodb')
         self.nodes_table = self.dynamodb.Table(os.environ.get('NODES_TABLE', 'cc-nodes-dev'))
         self.edges_table = self.dynamodb.Table(os.environ.get('EDGES_TABLE', 'cc-edges-dev'))
+        self.repos_table = self.dynamodb.Table(os.environ.get('REPOS_TABLE', 'cc-repos-dev'))
         
         # Configuration
         self.max_commits = 500
         self.max_issues = 500
         self.max_prs = 500
         self.recent_days = 120
+        self.max_workers = 8  # concurrent GitHub requests per fan-out
+        self.rate_limit_floor = 50  # start spacing requests out below this many remaining
+        
+        # Per-run memo of fetched files and parsed CODEOWNERS, so repeat
+        # lookups (e.g. a full scrape then an incremental one) skip the work
+        self.file_contents = {}
+        self.parsed_codeowners = {}
+        
+        # ETag cache: request key -> {"etag", "data", "links", "used_at"}, saved on exit
+        self.etag_cache = self._load_etag_cache()
+        self.etag_cache_dirty = False
+        atexit.register(self.save_etag_cache)
+    
+    def _load_etag_cache(self) -> Dict[str, Dict]:
+        """Load the unexpired part of the ETag cache left by a previous run, if any"""
+        try:
+            with open(ETAG_CACHE_FILE, 'r', encoding='utf-8') as f:
+                cache = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return {}
+        cutoff = time.time() - ETAG_CACHE_MAX_AGE_SECONDS
+        return {key: entry for key, entry in cache.items() if entry.get('used_at', 0) >= cutoff}
+    
+    def save_etag_cache(self):
+        """Write the ETag cache back to disk if this run changed it, keeping the most recently used entries"""
+        if not self.etag_cache_dirty:
+            return
+        cutoff = time.time() - ETAG_CACHE_MAX_AGE_SECONDS
+        recent = sorted((item for item in self.etag_cache.items() if item[1].get('used_at', 0) >= cutoff),
+                        key=lambda item: item[1]['used_at'], reverse=True)
+        try:
+            with open(ETAG_CACHE_FILE, 'w', encoding='utf-8') as f:
+                json.dump(dict(recent[:ETAG_CACHE_MAX_ENTRIES]), f)
+            self.etag_cache_dirty = False
+        except OSError as e:
+            print(f"⚠️  Could not save ETag cache: {e}")
+    
+    def _is_rate_limited(self, response: requests.Response) -> bool:
+        """True for GitHub's primary (403, budget exhausted) and secondary (Retry-After) rate limits"""
+        return response.status_code in (403, 429) and (
+            'Retry-After' in response.headers or response.headers.get('X-RateLimit-Remaining') == '0'
+        )
+    
+    def _rate_limit_wait(self, response: requests.Response) -> float:
+        """Seconds until a rate-limited request may be retried"""
+        if 'Retry-After' in response.headers:
+            return float(response.headers['Retry-After'])
+        reset = int(response.headers.get('X-RateLimit-Reset', 0))
+        return max(reset - time.time(), 0) + 1
     
-    def _make_request(self, url: str, params: Optional[Dict] = None) -> Optional[requests.Response]:
+    def _throttle(self, response: requests.Response):
+        """Spread the remaining budget over the rest of the window once it runs low"""
+        remaining = int(response.headers.get('X-RateLimit-Remaining', self.rate_limit_floor))
+        if remaining >= self.rate_limit_floor:
+            return
+        reset = int(response.headers.get('X-RateLimit-Reset', 0))
+        time.sleep(max(reset - time.time(), 0) / max(remaining, 1))
+    
+    def _send(self, method: str, url: str, **kwargs) -> requests.Response:
+        """Send a GitHub request, sleeping only when the rate limit headers call for it"""
+        for attempt in range(3):
+            response = self.session.request(method, url, timeout=60, **kwargs)
+            if attempt == 2 or not self._is_rate_limited(response):
+                break
+            wait = self._rate_limit_wait(response)
+            print(f"⏳ Rate limited, waiting {wait:.0f}s...")
+            time.sleep(wait)
+        
+        self._throttle(response)
+        response.raise_for_status()
+        return response
+    
+    def _make_request(self, url: str, params: Optional[Dict] = None,
+                      headers: Optional[Dict] = None) -> Optional[requests.Response]:
         """Make authenticated GitHub API request"""
         try:
-            response = requests.get(url, headers=self.headers, params=params, timeout=60)
-            response.raise_for_status()
-            return response
+            return self._send('GET', url, params=params, headers=headers)
         except requests.exceptions.RequestException as e:
             print(f"❌ Request error: {e}")
             return None
     
-    def _fetch_paginated(self, url: str, params: Optional[Dict] = None, max_pages: Optional[int] = None) -> List[Dict]:
-        """Fetch paginated data from GitHub API"""
-        all_data = []
-        page = 1
+    def _graphql_request(self, query: str, variables: Dict) -> Optional[Dict]:
+        """Run a GitHub GraphQL query and return its data, or None on failure"""
+        try:
+            response = self._send('POST', self.graphql_url, json={'query': query, 'variables': variables})
+            payload = response.json()
+        except (requests.exceptions.RequestException, json.JSONDecodeError) as e:
+            print(f"❌ GraphQL request error: {e}")
+            return None
+        
+        if payload.get('errors'):
+            print(f"❌ GraphQL error: {payload['errors'][0].get('message')}")
+            return None
+        return payload.get('data')
+    
+    def _get_json(self, url: str, params: Optional[Dict] = None) -> Tuple[Any, Dict]:
+        """GET a JSON resource and its Link relations, revalidating cached copies by ETag"""
+        cache_key = f"{url}?{urlencode(sorted((params or {}).items()))}"
+        cached = self.etag_cache.get(cache_key)
+        
+        response = self._make_request(url, params, {'If-None-Match': cached['etag']} if cached else None)
+        if not response:
+            return None, {}
+        if response.status_code == 304 and cached:
+            cached['used_at'] = time.time()
+            self.etag_cache_dirty = True
+            return cached['data'], cached['links']
+        
+        try:
+            data = response.json()
+        except json.JSONDecodeError:
+            return None, {}
+        
+        etag = response.headers.get('ETag')
+        if etag:
+            self.etag_cache[cache_key] = {'etag': etag, 'data': data, 'links': response.links, 'used_at': time.time()}
+            self.etag_cache_dirty = True
+        return data, response.links
+    
+    def _fetch_page(self, url: str, params: Dict) -> Tuple[Optional[List[Dict]], Dict]:
+        """Items of one page of a list endpoint (None if missing or empty) and its Link relations"""
+        data, links = self._get_json(url, params)
+        return (data if isinstance(data, list) and data else None), links
+    
+    def _last_page(self, links: Dict) -> int:
+        """Last page number from GitHub's Link header (1 when there is only one page)"""
+        last_url = links.get('last', {}).get('url')
+        if not last_url:
+            return 1
+        return int(parse_qs(urlparse(last_url).query).get('page', ['1'])[0])
+    
+    def _collect(self, all_data: List[Dict], page_data: List[Dict], stop_predicate: Optional[Callable[[Dict], bool]]) -> bool:
+        """Append a page's items up to the first one matching stop_predicate; True if one matched"""
+        if stop_predicate is not None:
+            for index, item in enumerate(page_data):
+                if stop_predicate(item):
+                    all_data.extend(page_data[:index])
+                    return True
+        all_data.extend(page_data)
+        return False
+    
+    def _fetch_paginated(self, url: str, params: Optional[Dict] = None, max_pages: Optional[int] = None,
+                         stop_predicate: Optional[Callable[[Dict], bool]] = None) -> List[Dict]:
+        """
+        Fetch paginated data from GitHub API; pages after the first are fetched concurrently
+        
+        stop_predicate marks the first item past the wanted range (e.g. updated
+        before a cutoff); it and everything after it are dropped and no further
+        pages are requested.
+        """
         request_params = params.copy() if params else {}
         request_params['per_page'] = 100
+        request_params['page'] = 1
         
-        while max_pages is None or page <= max_pages:
-            request_params['page'] = page
-            response = self._make_request(url, request_params)
-            
-            if not response:
-                break
-            
-            try:
-                data = response.json()
-                if not isinstance(data, list) or not data:
-                    break
-                
-                all_data.extend(data)
-                page += 1
-                time.sleep(0.3)  # Rate limiting
-            except json.JSONDecodeError:
-                break
+        first_page, links = self._fetch_page(url, request_params)
+        if not first_page:
+            return []
+        
+        all_data = []
+        if self._collect(all_data, first_page, stop_predicate):
+            return all_data
+        
+        # The first response names the last page (no Link header means this was
+        # the only one), so the rest can be requested without probing for an empty page
+        last_page = self._last_page(links)
+        if max_pages is not None:
+            last_page = min(last_page, max_pages)
+        
+        # Every page is needed unless a stop condition may end the listing early;
+        # then request one pool's worth at a time so little is fetched past it
+        pages = [dict(request_params, page=page) for page in range(2, last_page + 1)]
+        batch_size = self.max_workers if stop_predicate is not None else len(pages)
+        if pages:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                for start in range(0, len(pages), batch_size):
+                    batch = pages[start:start + batch_size]
+                    for page_data, _ in executor.map(lambda page_params: self._fetch_page(url, page_params), batch):
+                        if not page_data or self._collect(all_data, page_data, stop_predicate):
+                            return all_data
         
         return all_data
     
@@ -87,59 +437,71 @@ class ComprehensiveGitHubScraper:
         if not text:
             return []
         
-        pattern = r'(?:fix(?:es|ed)?|close(?:s|d)?|resolve(?:s|d)?)\s+#(\d+)'
-        matches = re.findall(pattern, text, re.IGNORECASE)
-        
-        bare_pattern = r'#(\d+)'
-        bare_matches = re.findall(bare_pattern, text)
-        
-        all_issues = list(set([int(m) for m in matches] + [int(m) for m in bare_matches]))
-        return sorted(all_issues)
+        return list(linked_issue_numbers(text))
     
     def get_file_content(self, owner: str, repo: str, path: str, branch: Optional[str] = None) -> Optional[str]:
-        """Get raw content of a specific file"""
+        """Get raw content of a specific file (memoized per owner/repo/path/branch)"""
         if not branch:
             branch = "main"
         
+        key = (owner, repo, path, branch)
+        if key not in self.file_contents:
+            self.file_contents[key] = self._fetch_file_content(owner, repo, path, branch)
+        return self.file_contents[key]
+    
+    def _fetch_file_content(self, owner: str, repo: str, path: str, branch: str) -> Optional[str]:
+        """Download and decode a file through the contents API"""
         url = f"{self.base_url}/repos/{owner}/{repo}/contents/{path}"
         params = {"ref": branch}
         
-        response = self._make_request(url, params)
-        if not response:
+        data, _ = self._get_json(url, params)
+        if not data:
             return None
         
         try:
-            data = response.json()
-            import base64
-            return base64.b64decode(data['content']).decode('utf-8')
+            if data.get('encoding') != 'base64':
+                return data.get('content') or None
+            # a2b_base64 skips the newlines GitHub wraps the content with
+            return binascii.a2b_base64(data['content']).decode('utf-8')
         except Exception as e:
             print(f"  ⚠️  Error reading {path}: {e}")
             return None
     
     def parse_codeowners(self, content: str) -> Dict[str, List[str]]:
-        """Parse CODEOWNERS file"""
+        """Parse CODEOWNERS file (memoized per content)"""
+        if content in self.parsed_codeowners:
+            return self.parsed_codeowners[content]
+        
         owners_map = {}
-        for line in content.split('\n'):
-            line = line.strip()
-            if not line or line.startswith('#'):
-                continue
-            
+        for line in content.splitlines():
+            # split() also drops surrounding whitespace, so no strip() is needed;
+            # blank, comment and owner-less lines all fail the first check
             parts = line.split()
-            if len(parts) < 2:
+            if len(parts) < 2 or parts[0].startswith('#'):
                 continue
             
-            pattern = parts[0]
-            owners = []
-            for owner in parts[1:]:
-                if owner.startswith('@'):
-                    username = owner[1:].split('/')[0]
-                    owners.append(username)
-            
+            owners = [owner[1:].partition('/')[0] for owner in parts[1:] if owner.startswith('@')]
             if owners:
-                owners_map[pattern] = owners
+                owners_map[parts[0]] = owners
         
+        self.parsed_codeowners[content] = owners_map
         return owners_map
     
+    def _fetch_special_files(self, owner: str, repo: str) -> Dict[str, Optional[str]]:
+        """Contents of every SPECIAL_FILE_PATHS location (None if missing), memoized per repo"""
+        keys = [(owner, repo, path, "HEAD") for path in SPECIAL_FILE_PATHS]
+        if not all(key in self.file_contents for key in keys):
+            data = self._graphql_request(SPECIAL_FILES_QUERY, {"owner": owner, "name": repo})
+            if not data:
+                return dict.fromkeys(SPECIAL_FILE_PATHS)
+            
+            repository = data.get("repository") or {}
+            for index, key in enumerate(keys):
+                blob = repository.get(f"file{index}") or {}
+                self.file_contents[key] = blob.get("text") or None
+        
+        return {path: self.file_contents[key] for path, key in zip(SPECIAL_FILE_PATHS, keys)}
+    
     def get_special_files(self, owner: str, repo: str) -> Dict[str, Any]:
         """Fetch and parse special files: CODEOWNERS, CONTRIBUTING.md, package.json"""
         print(f"📄 Fetching special files...")
@@ -150,25 +512,27 @@ class ComprehensiveGitHubScraper:
             "package_json": None,
         }
         
-        # Try multiple locations for CODEOWNERS
-        for path in ["CODEOWNERS", ".github/CODEOWNERS", "docs/CODEOWNERS"]:
-            content = self.get_file_content(owner, repo, path)
+        contents = self._fetch_special_files(owner, repo)
+        
+        # First location found wins for CODEOWNERS
+        for path in CODEOWNERS_PATHS:
+            content = contents[path]
             if content:
                 special_files["codeowners"] = content
                 special_files["codeowners_parsed"] = self.parse_codeowners(content)
                 print(f"  ✓ Found CODEOWNERS at {path}")
                 break
         
-        # Try multiple locations for CONTRIBUTING
-        for path in ["CONTRIBUTING.md", ".github/CONTRIBUTING.md", "docs/CONTRIBUTING.md"]:
-            content = self.get_file_content(owner, repo, path)
+        # First location found wins for CONTRIBUTING
+        for path in CONTRIBUTING_PATHS:
+            content = contents[path]
             if content:
                 special_files["contributing"] = content
                 print(f"  ✓ Found CONTRIBUTING.md at {path}")
                 break
         
         # Get package.json
-        content = self.get_file_content(owner, repo, "package.json")
+        content = contents["package.json"]
         if content:
             try:
                 special_files["package_json"] = json.loads(content)
@@ -192,78 +556,102 @@ class ComprehensiveGitHubScraper:
             "direction": "desc"
         }
         
-        issues_data = self._fetch_paginated(url, params)
+        # The since filter is applied by GitHub; stopping at the first older
+        # issue also guards against it being ignored
+        since_str = github_timestamp(since)
+        issues_data = self._fetch_paginated(url, params, stop_predicate=lambda issue: issue["updated_at"] < since_str)
         
         issues = []
         for issue_data in issues_data:
             if "pull_request" in issue_data:
                 continue
             
-            user_data = issue_data.get('user')
-            if not user_data:
-                continue
-            
-            issues.append({
-                "number": issue_data.get("number"),
-                "title": issue_data.get("title"),
-                "body": issue_data.get("body"),
-                "state": issue_data.get("state"),
-                "created_at": issue_data.get("created_at"),
-                "updated_at": issue_data.get("updated_at"),
-                "author": user_data.get("login"),
-                "labels": [l.get("name") for l in issue_data.get("labels", [])],
-                "html_url": issue_data.get("html_url"),
-            })
+            issue = summarize_issue(issue_data)
+            if issue:
+                issues.append(issue)
         
         print(f"  ✓ Found {len(issues)} updated issues")
         return issues
     
     def get_updated_prs(self, owner: str, repo: str, since: str, include_files: bool = True) -> List[Dict]:
-        """Get PRs updated since a specific timestamp"""
+        """Get PRs updated since a specific timestamp, with their files, via GraphQL"""
         print(f"🔄 Fetching PRs updated since {since}...")
-        url = f"{self.base_url}/repos/{owner}/{repo}/pulls"
-        params = {
-            "state": "all",
-            "per_page": 100,
-            "sort": "updated",
-            "direction": "desc"
-        }
-        
-        prs_data = self._fetch_paginated(url, params, max_pages=10)
+        variables = {"owner": owner, "name": repo, "cursor": None, "includeFiles": include_files}
         
-        since_dt = datetime.fromisoformat(since.replace("Z", "+00:00"))
+        since_str = github_timestamp(since)
         recent_prs = []
+        more_files = []
         
-        for pr_data in prs_data:
-            updated_at = datetime.fromisoformat(pr_data["updated_at"].replace("Z", "+00:00"))
-            if updated_at < since_dt:
+        for _ in range(10):  # newest 1,000 PRs at most
+            data = self._graphql_request(UPDATED_PRS_QUERY, variables)
+            if not data or not data.get("repository"):
                 break
             
-            user_data = pr_data.get('user')
-            if not user_data:
-                continue
-            
-            linked_issues = self._extract_linked_issues(pr_data.get("body", ""))
-            
-            pr = {
-                "number": pr_data.get("number"),
-                "title": pr_data.get("title"),
-                "body": pr_data.get("body"),
-                "state": pr_data.get("state"),
-                "merged": pr_data.get("merged"),
-                "created_at": pr_data.get("created_at"),
-                "updated_at": pr_data.get("updated_at"),
-                "author": user_data.get("login"),
-                "linked_issues": linked_issues,
-                "html_url": pr_data.get("html_url"),
-                "files": []
-            }
-            
-            if include_files:
-                pr["files"] = self.get_pr_files(owner, repo, pr["number"])
-                time.sleep(0.2)
+            pull_requests = data["repository"]["pullRequests"]
+            reached_since = False
+            for pr_data in pull_requests["nodes"]:
+                if pr_data["updatedAt"] < since_str:
+                    reached_since = True
+                    break
+                
+                user_data = pr_data.get('author')
+                if not user_data:
+                    continue
+                
+                linked_issues = self._extract_linked_issues(pr_data.get("body", ""))
+                
+                pr = {
+                    "number": pr_data.get("number"),
+                    "title": pr_data.get("title"),
+                    "body": pr_data.get("body"),
+                    "state": "open" if pr_data.get("state") == "OPEN" else "closed",
+                    "merged": pr_data.get("merged"),
+                    "draft": pr_data.get("isDraft", False),
+                    "created_at": pr_data.get("createdAt"),
+                    "updated_at": pr_data.get("updatedAt"),
+                    "closed_at": pr_data.get("closedAt"),
+                    "merged_at": pr_data.get("mergedAt"),
+                    "author": interned(user_data.get("login")),
+                    "author_url": user_data.get("url"),
+                    "author_avatar_url": user_data.get("avatarUrl"),
+                    "linked_issues": linked_issues,
+                    "html_url": pr_data.get("url"),
+                    "additions": pr_data.get("additions", 0),
+                    "deletions": pr_data.get("deletions", 0),
+                    "changed_files": pr_data.get("changedFiles", 0),
+                    "commits": (pr_data.get("commits") or {}).get("totalCount", 0),
+                    "base_branch": interned(pr_data.get("baseRefName")),
+                    "head_branch": pr_data.get("headRefName"),
+                    "files": []
+                }
+                
+                if include_files:
+                    files_data = pr_data["files"]
+                    for file_data in files_data["nodes"]:
+                        filename = file_data.get("path", "")
+                        pr["files"].append({
+                            "filename": filename,
+                            "directory": interned(filename.rpartition("/")[0]),
+                            "status": CHANGE_TYPE_STATUS.get(file_data.get("changeType"), "changed"),
+                            "additions": file_data.get("additions"),
+                            "deletions": file_data.get("deletions"),
+                        })
+                    if files_data["pageInfo"]["hasNextPage"]:
+                        more_files.append(pr)
+                
+                recent_prs.append(pr)
             
-            recent_prs.append(pr)
+            page_info = pull_requests["pageInfo"]
+            if reached_since or not page_info["hasNextPage"]:
+                break
+            variables["cursor"] = page_info["endCursor"]
+        
+        if more_files:
+            # Only PRs touching more than 100 files need the paginated REST listing
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                pr_files = executor.map(lambda pr: self.get_pr_files(owner, repo, pr["number"]), more_files)
+                for pr, files in zip(more_files, pr_files):
+                    pr["files"] = files
         
         print(f"  ✓ Found {len(recent_prs)} updated PRs")
         return recent_prs
@@ -276,11 +664,9 @@ class ComprehensiveGitHubScraper:
         files = []
         for file_data in files_data:
             filename = file_data.get("filename", "")
-            directory = "/".join(filename.split("/")[:-1]) if "/" in filename else ""
-            
             files.append({
                 "filename": filename,
-                "directory": directory,
+                "directory": interned(filename.rpartition("/")[0]),
                 "status": file_data.get("status"),
                 "additions": file_data.get("additions"),
                 "deletions": file_data.get("deletions"),
@@ -296,16 +682,17 @@ class ComprehensiveGitHubScraper:
         print(f"{'='*60}")
         
         start_time = time.time()
+        now_iso = utc_now_iso()
         
         update_data = {
             "repository": f"{owner}/{repo}",
             "last_update": last_update,
-            "current_time": datetime.utcnow().isoformat() + "Z",
+            "current_time": now_iso,
             "updated_issues": [],
             "updated_prs": [],
             "metadata": {
                 "update_type": "incremental",
-                "scraped_at": datetime.utcnow().isoformat(),
+                "scraped_at": now_iso,
             }
         }
         
@@ -346,7 +733,7 @@ class ComprehensiveGitHubScraper:
             "pull_requests": [],
             "special_files": {},
             "metadata": {
-                "scraped_at": datetime.utcnow().isoformat(),
+                "scraped_at": utc_now_iso(),
                 "scraper_version": "2.0.0",
             }
         }
@@ -360,6 +747,7 @@ class ComprehensiveGitHubScraper:
                 "login": c.get("login"),
                 "contributions": c.get("contributions"),
                 "avatar_url": c.get("avatar_url"),
+                "html_url": c.get("html_url"),
             }
             for c in contributors_data if c.get("type") == "User"
         ]
@@ -371,48 +759,26 @@ class ComprehensiveGitHubScraper:
         # 3. Get issues
         print(f"📋 Fetching issues...")
         url = f"{self.base_url}/repos/{owner}/{repo}/issues"
-        issues_data = self._fetch_paginated(url, {"state": "all", "per_page": 100})
+        issues_data = self._fetch_paginated(url, {"state": "all", "per_page": 100},
+                                            max_pages=math.ceil(self.max_issues / 100))
         
         for issue_data in issues_data[:self.max_issues]:
             if "pull_request" in issue_data:
                 continue
             
-            user_data = issue_data.get('user')
-            if not user_data:
-                continue
-            
-            data["issues"].append({
-                "number": issue_data.get("number"),
-                "title": issue_data.get("title"),
-                "state": issue_data.get("state"),
-                "author": user_data.get("login"),
-                "labels": [l.get("name") for l in issue_data.get("labels", [])],
-                "created_at": issue_data.get("created_at"),
-            })
+            issue = summarize_issue(issue_data)
+            if issue:
+                data["issues"].append(issue)
         
         print(f"  ✓ Found {len(data['issues'])} issues")
         
         # 4. Get PRs
         print(f"🔀 Fetching pull requests...")
         url = f"{self.base_url}/repos/{owner}/{repo}/pulls"
-        prs_data = self._fetch_paginated(url, {"state": "all", "per_page": 100})
+        prs_data = self._fetch_paginated(url, {"state": "all", "per_page": 100},
+                                         max_pages=math.ceil(self.max_prs / 100))
         
-        for pr_data in prs_data[:self.max_prs]:
-            user_data = pr_data.get('user')
-            if not user_data:
-                continue
-            
-            linked_issues = self._extract_linked_issues(pr_data.get("body", ""))
-            
-            data["pull_requests"].append({
-                "number": pr_data.get("number"),
-                "title": pr_data.get("title"),
-                "state": pr_data.get("state"),
-                "merged": pr_data.get("merged"),
-                "author": user_data.get("login"),
-                "linked_issues": linked_issues,
-                "created_at": pr_data.get("created_at"),
-            })
+        data["pull_requests"] = [pr for pr in map(summarize_pr, prs_data[:self.max_prs]) if pr]
         
         print(f"  ✓ Found {len(data['pull_requests'])} PRs")
         
@@ -428,18 +794,143 @@ class ComprehensiveGitHubScraper:
         
         return data
     
+    # ==================== DYNAMODB ====================
+    
+    def _create_missing_nodes(self, items: Dict[str, Dict]) -> int:
+        """
+        Write the nodes in items (nodeId -> item) that don't exist yet, checking
+        existence with 100-key BatchGetItem calls and writing in 25-item batches.
+        Returns how many were created.
+        """
+        existing = set()
+        node_ids = list(items)
+        for start in range(0, len(node_ids), 100):
+            request = {self.nodes_table.name: {
+                'Keys': [{'nodeId': node_id} for node_id in node_ids[start:start + 100]],
+                'ProjectionExpression': 'nodeId'
+            }}
+            while request:
+                response = self.dynamodb.batch_get_item(RequestItems=request)
+                existing.update(item['nodeId'] for item in response['Responses'].get(self.nodes_table.name, []))
+                request = response.get('UnprocessedKeys')
+        
+        missing = [item for node_id, item in items.items() if node_id not in existing]
+        with self.nodes_table.batch_writer() as nw:
+            for item in missing:
+                nw.put_item(Item=item)
+        return len(missing)
+    
+    def persist(self, data: Dict):
+        """
+        Write a full scrape or incremental update to the nodes/edges tables
+        in the shapes the ingest Lambda writes. Nodes the scraper can't fully
+        populate (authors outside the contributor list, PRs from the REST
+        listing) are only created when missing, never overwritten. Issues
+        get no labelMask unless their label bits could be saved to the
+        repos table (the repo must be registered there).
+        """
+        print(f"\n🗄️  Writing to DynamoDB...")
+        repo_name = data["repository"]
+        owner, repo = repo_name.split('/')
+        repo_id = f"repo#{repo_name}"
+        now = datetime.now(timezone.utc).isoformat()
+        contributors = data.get("contributors", [])
+        issues = data.get("issues") or data.get("updated_issues") or []
+        prs = data.get("pull_requests") or data.get("updated_prs") or []
+        
+        # Bits for every label are saved before any mask that uses them is written
+        label_index = claim_label_bits(self.repos_table, owner, repo,
+                                       [name for issue in issues for name in issue.get('labels', [])])
+        if label_index is None:
+            print(f"  ⚠️ Label bits for {owner}/{repo} could not be saved; issues are written without label masks")
+        contributor_logins = {c['login'] for c in contributors}
+        missing_only = {}
+        
+        def author_node(record: Dict) -> Dict:
+            """AUTHORED edge source; non-contributor author nodes are queued as create-only"""
+            user_data = {
+                'login': record['author'],
+                'html_url': record.get('author_url'),
+                'avatar_url': record.get('author_avatar_url')
+            }
+            if record['author'] not in contributor_logins:
+                user_id = f"user#{record['author']}"
+                missing_only[user_id] = node_item(user_id, 'user', user_node_data(user_data), now)
+            return user_data
+        
+        # batch_writer buffers puts into 25-item BatchWriteItem calls and
+        # resends unprocessed items; overwrite_by_pkeys drops duplicate keys
+        with self.nodes_table.batch_writer(overwrite_by_pkeys=['nodeId']) as nw, \
+                self.edges_table.batch_writer(overwrite_by_pkeys=['fromId', 'toIdEdgeType']) as ew:
+            for contributor in contributors:
+                user_id = f"user#{contributor['login']}"
+                contributions = contributor.get('contributions', 0)
+                nw.put_item(Item=node_item(user_id, 'user', user_node_data(contributor, contributions), now))
+                ew.put_item(Item=edge_item(user_id, repo_id, 'CONTRIBUTES_TO',
+                                           {'contributions': contributions},
+                                           user_edge_attributes(contributor), now))
+            
+            for issue in issues:
+                issue_id = f"issue#{repo_name}#{issue['number']}"
+                label_names = issue.get('labels', [])
+                mask = label_mask(label_names, label_index) if label_index is not None else None
+                nw.put_item(Item=node_item(issue_id, 'issue', issue_node_data(issue, label_names, mask), now))
+                user_data = author_node(issue)
+                ew.put_item(Item=edge_item(f"user#{issue['author']}", issue_id, 'AUTHORED',
+                                           {'createdAt': issue.get('created_at')},
+                                           user_edge_attributes(user_data), now))
+                ew.put_item(Item=edge_item(issue_id, repo_id, 'IN_REPO', updated_at=now))
+                
+                label_colors = issue.get('label_colors', {})
+                for label_name in label_names:
+                    label_id = f"label#{repo_name}#{label_name}"
+                    nw.put_item(Item=node_item(label_id, 'label', label_node_data(label_name, label_colors.get(label_name)), now))
+                    ew.put_item(Item=edge_item(issue_id, label_id, 'HAS_LABEL', updated_at=now))
+            
+            for pr in prs:
+                pr_id = f"pr#{repo_name}#{pr['number']}"
+                # pr_node_data reads REST-shaped base/head refs
+                pr_item = node_item(pr_id, 'pull_request', pr_node_data({
+                    **pr, 'base': {'ref': pr.get('base_branch')}, 'head': {'ref': pr.get('head_branch')}
+                }), now)
+                if all(field in pr for field in PR_DETAIL_FIELDS):
+                    nw.put_item(Item=pr_item)
+                else:
+                    missing_only[pr_id] = pr_item
+                user_data = author_node(pr)
+                ew.put_item(Item=edge_item(f"user#{pr['author']}", pr_id, 'AUTHORED',
+                                           {'createdAt': pr.get('created_at')},
+                                           user_edge_attributes(user_data), now))
+                ew.put_item(Item=edge_item(pr_id, repo_id, 'IN_REPO', updated_at=now))
+                
+                for file_data in pr.get("files", []):
+                    file_id = f"file#{repo_name}#{file_data['filename']}"
+                    nw.put_item(Item=node_item(file_id, 'file', file_node_data(file_data['filename']), now))
+                    ew.put_item(Item=edge_item(pr_id, file_id, 'TOUCHES', {
+                        'additions': file_data.get('additions') or 0,
+                        'deletions': file_data.get('deletions') or 0,
+                        'status': file_data.get('status')
+                    }, updated_at=now))
+        
+        created = self._create_missing_nodes(missing_only)
+        
+        print(f"  ✓ Wrote {len(contributors)} contributors, {len(issues)} issues, {len(prs)} PRs "
+              f"({created}/{len(missing_only)} partial nodes created)")
+    
     def save_to_json(self, data: Dict, filename: str):
-        """Save data to JSON file"""
-        with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
+        """Save data to JSON file, encoding with orjson's C encoder when available"""
+        if orjson is not None:
+            with open(filename, 'wb') as f:
+                f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+        else:
+            with open(filename, 'w', encoding='utf-8') as f:
+                json.dump(data, f, indent=2, ensure_ascii=False)
         print(f"\n💾 Saved data to {filename}")
 
 
 # ==================== MAIN ====================
 
 if __name__ == "__main__":
-    import sys
-    
     # Get GitHub token from environment
     token = os.environ.get('GITHUB_TOKEN')
     if not token:
@@ -455,14 +946,21 @@ if __name__ == "__main__":
         repo_full_name = sys.argv[1]  # e.g., "RooCodeInc/Roo-Code"
         owner, repo = repo_full_name.split('/')
         
+        # --persist also writes the results to the DynamoDB graph tables
+        persist = '--persist' in sys.argv[2:]
+        
         # Full scrape
         data = scraper.scrape_repository_full(owner, repo)
         scraper.save_to_json(data, f"{owner}_{repo}_full_scrape.json")
+        if persist:
+            scraper.persist(data)
         
         # Incremental update example (last 7 days)
-        since = (datetime.utcnow() - timedelta(days=7)).isoformat() + "Z"
+        since = (datetime.now(timezone.utc) - timedelta(days=7)).isoformat(timespec='seconds').replace('+00:00', 'Z')
         update_data = scraper.incremental_update(owner, repo, since)
         scraper.save_to_json(update_data, f"{owner}_{repo}_incremental.json")
+        if persist:
+            scraper.persist(update_data)
     else:
-        print("Usage: python comprehensive_scraper.py <owner/repo>")
+        print("Usage: python comprehensive_scraper.py <owner/repo> [--persist]")
         print("Example: python comprehensive_scraper.py RooCodeInc/Roo-Code")